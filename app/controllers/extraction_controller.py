@@ -1,49 +1,94 @@
 # app/controllers/extraction_controller.py
-from typing import Annotated, Dict, final
-from fastapi import APIRouter, HTTPException, Depends, File, UploadFile
-from app.models.response import ExtractionResponse, Status
+from typing import Annotated, Tuple
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, File, UploadFile
+from app.models.response import ExtractionResponse, ExtractionStatusResponse, Status
 from app.utils.create_embeddings import CreateEmbeddings
 from app.utils.dependencies import (
-    get_document_extractor,
+    get_document_cache,
     get_embedding,
+    get_extraction_executor,
+    get_job_manager,
     get_session_manager,
+    get_transaction_store,
     get_redis_db,
 )
-from app.utils.document_extractor import DocumentExtractor
+from app.utils.document_cache import DocumentCache
+from app.utils.extraction_executor import ExtractionExecutor, ExtractionPoolSaturated
+from app.utils.extraction_pipeline import run_extraction_job
+from app.utils.job_manager import JobManager
 from app.utils.redisdb import RedisDB
-from app.utils.retreiver import Retreiver
 from app.utils.session_manager import SessionManager
-import shutil
-import tempfile
+from app.utils.transaction_store import TransactionStore
+import asyncio
+import hashlib
 import os
 import logging
 
 router = APIRouter(prefix="/api/extraction", tags=["extraction"])
 logger = logging.getLogger(__name__)
 
-@router.post("/process", response_model=ExtractionResponse)
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))  # 10MB
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+async def _read_upload(
+    file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES
+) -> Tuple[bytes, str]:
+    """
+    Read the upload into memory in chunks, hashing as it goes
+
+    Stops as soon as the cap is crossed, whether or not the client sent a
+    size, and returns the document bytes with their SHA-256 hex digest.
+    """
+    digest = hashlib.sha256()
+    chunks = []
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+        digest.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), digest.hexdigest()
+
+
+@router.post("/process", response_model=ExtractionResponse, status_code=202)
 async def process_document_extraction(
     file: Annotated[UploadFile, File()],
+    background_tasks: BackgroundTasks,
     redis_db: Annotated[RedisDB, Depends(get_redis_db)],
     session_manager: Annotated[SessionManager, Depends(get_session_manager)],
-    document_extractor: Annotated[DocumentExtractor, Depends(get_document_extractor)],
     embedding: Annotated[CreateEmbeddings, Depends(get_embedding)],
+    executor: Annotated[ExtractionExecutor, Depends(get_extraction_executor)],
+    job_manager: Annotated[JobManager, Depends(get_job_manager)],
+    document_cache: Annotated[DocumentCache, Depends(get_document_cache)],
+    transaction_store: Annotated[TransactionStore, Depends(get_transaction_store)],
 ) -> ExtractionResponse:
     """
-    Extract and process PDF document to create embeddings
+    Accept a PDF document and start extracting it in the background
 
     Args:
-        file: PDF file to process (must be PDF format, max 10MB)
+        file: PDF file to process (must be PDF format, max MAX_UPLOAD_BYTES)
+        background_tasks: FastAPI background task queue running the extraction
         redis_db: Redis database instance for storing embeddings
         session_manager: Session manager for handling user sessions
-        document_extractor: Document extraction utility
         embedding: Embedding creation utility
+        executor: Worker pools that keep parsing and I/O off the event loop
+        job_manager: Tracks the progress of the extraction job
+        document_cache: Cache of previously extracted and embedded statements
+        transaction_store: Columnar store of the parsed transactions
 
     Returns:
-        ExtractionResponse with status and session ID
+        ExtractionResponse with the session ID to poll for progress
 
     Raises:
-        HTTPException: If file validation fails or processing errors occur
+        HTTPException: If file validation fails, the file is over the size
+            limit (413), the worker pool is saturated (429) or the upload
+            cannot be read
     """
     if not file.filename or not file.filename.lower().endswith('.pdf'):
         raise HTTPException(
@@ -51,77 +96,135 @@ async def process_document_extraction(
             detail="Only PDF files are supported"
         )
     
-
-    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-    if file.size and file.size > MAX_FILE_SIZE:
+    if file.size and file.size > MAX_UPLOAD_BYTES:
         raise HTTPException(
-            status_code=400,
-            detail="File size exceeds 10MB limit"
+            status_code=413,
+            detail=f"File size exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)}MB limit"
         )
     
-    logger.info(f"Starting document extraction for file: {file.filename}")
+    try:
+        executor.acquire_slot()
+    except ExtractionPoolSaturated as e:
+        logger.warning(f"Rejecting extraction for {file.filename}: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail="Too many documents are being processed, please retry shortly"
+        )
 
-    fd, temp_path = tempfile.mkstemp(
-        suffix=file.filename, prefix="finance-rag-file-upload-"
-    )
+    logger.info(f"Starting document extraction for file: {file.filename}")
 
     try:
-        with os.fdopen(fd, "wb") as temp_file:
-            shutil.copyfileobj(file.file, temp_file)
-        
+        pdf_bytes, document_hash = await _read_upload(file)
         await file.close()
-        logger.info(f"File saved to temporary location: {temp_path}")
+        logger.info(f"Read {len(pdf_bytes)} bytes of {file.filename}")
 
-        redis_db.ping()
-        redis_db.flush_memory()
+        await redis_db.aping()
 
-        session_id = session_manager.create_sesssion()
+        session_id = await asyncio.to_thread(
+            session_manager.create_sesssion, document_hash=document_hash
+        )
+        await asyncio.to_thread(job_manager.create_job, session_id)
         logger.info(f"Created session: {session_id}")
 
-        result = document_extractor.extract_statement(temp_path)
-        transactions_data = result["tables_data"]["transactions"]
-        text_data = result["full_text"]
-
-        trxn_rds = embedding.create_embeddings_for_transactions_data(
-            transactions_data=transactions_data, session_id=session_id
+    except UploadTooLarge as e:
+        logger.warning(f"Rejecting {file.filename}: {e}")
+        executor.release_slot()
+        raise HTTPException(
+            status_code=413,
+            detail=f"File size exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)}MB limit"
         )
 
-        text_rds = embedding.create_embeddings_for_text_data(
-            text_data=text_data, index_name="full_text_data", session_id=session_id
+    except Exception as e:
+        logger.error(f"Error in document upload: {e}", exc_info=True)
+        executor.release_slot()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error during extraction: {str(e)}"
         )
 
-        transactions_retreiver = Retreiver(rds=trxn_rds)
-        full_text_retreiver = Retreiver(rds=text_rds)
+    # The job owns the extraction slot and the document bytes from here on
+    background_tasks.add_task(
+        run_extraction_job,
+        session_id=session_id,
+        pdf_bytes=pdf_bytes,
+        filename=file.filename,
+        document_hash=document_hash,
+        executor=executor,
+        embedding=embedding,
+        document_cache=document_cache,
+        redis_db=redis_db,
+        session_manager=session_manager,
+        job_manager=job_manager,
+        transaction_store=transaction_store,
+    )
 
-        session_manager.add_retreivers_to_session(
-            session_id,
-            {
-                "transactions_retreiver": transactions_retreiver,
-                "full_text_retreiver": full_text_retreiver,
-            },
-        )
+    return ExtractionResponse(
+        status=Status.SUCCESS,
+        description="Extraction started",
+        session_id=session_id,
+    )
 
-        return ExtractionResponse(
-            status=Status.SUCCESS,
-            description="Extraction Successful",
-            session_id=session_id,
-        )
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error in document extraction: {e}", exc_info=True)
+@router.get("/{session_id}", response_model=ExtractionStatusResponse)
+async def get_extraction_status(
+    session_id: str,
+    job_manager: Annotated[JobManager, Depends(get_job_manager)],
+) -> ExtractionStatusResponse:
+    """
+    Report stage-level progress of an extraction job
+
+    Args:
+        session_id: Session returned by the upload endpoint
+        job_manager: Tracks the progress of the extraction job
+
+    Returns:
+        ExtractionStatusResponse with the current stage and progress counters
+
+    Raises:
+        HTTPException: If no extraction job exists for the session
+    """
+    job = await asyncio.to_thread(job_manager.get_job, session_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Extraction job does not exist")
+    return job
+
+
+@router.delete("/{session_id}", response_model=ExtractionResponse)
+async def delete_extraction_session(
+    session_id: str,
+    redis_db: Annotated[RedisDB, Depends(get_redis_db)],
+    session_manager: Annotated[SessionManager, Depends(get_session_manager)],
+    job_manager: Annotated[JobManager, Depends(get_job_manager)],
+) -> ExtractionResponse:
+    """
+    Delete a session along with its Redis indexes and documents
+
+    Args:
+        session_id: Session to delete
+        redis_db: Redis database instance holding the session indexes
+        session_manager: Session manager for handling user sessions
+        job_manager: Tracks the progress of the extraction job
+
+    Returns:
+        ExtractionResponse with status and session ID
+
+    Raises:
+        HTTPException: If the session does not exist or cannot be dropped
+    """
+    if not await asyncio.to_thread(session_manager.session_exists, session_id):
+        raise HTTPException(status_code=404, detail="Session does not exist")
+
+    if not await asyncio.to_thread(redis_db.drop_session, session_id):
         raise HTTPException(
             status_code=500,
-            detail=f"Internal server error during extraction: {str(e)}"
+            detail="Internal server error while deleting session"
         )
-        
-    finally:
-        
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail="Internal server error during extraction"
-            )
\ No newline at end of file
+    await asyncio.to_thread(session_manager.delete_session_by_id, session_id)
+    await asyncio.to_thread(job_manager.delete_job, session_id)
+    logger.info(f"Deleted session: {session_id}")
+
+    return ExtractionResponse(
+        status=Status.SUCCESS,
+        description="Session deleted",
+        session_id=session_id,
+    )
@@ -0,0 +1,134 @@
+import asyncio
+from typing import Annotated
+from fastapi import APIRouter, Depends
+from app.utils.dependencies import (
+    get_document_cache,
+    get_embedding_registry,
+    get_extraction_executor,
+    get_query_metrics,
+    get_semantic_cache,
+    get_session_manager,
+)
+from app.utils.chains.query_chain import QueryLatencyMetrics
+from app.utils.document_cache import DocumentCache
+from app.utils.embedding_registry import EmbeddingRegistry
+from app.utils.extraction_executor import ExtractionExecutor
+from app.utils.redis_pool import get_pool_metrics
+from app.utils.semantic_cache import SemanticCache
+from app.utils.session_manager import SessionManager
+
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+@router.get("/embeddings")
+async def get_embedding_metrics(
+    embedding_registry: Annotated[EmbeddingRegistry, Depends(get_embedding_registry)],
+) -> dict:
+    """
+    Report load time, encode timings and query cache hit rate for every
+    loaded embedding model
+
+    Args:
+        embedding_registry: Injected EmbeddingRegistry instance
+
+    Returns:
+        Mapping of model name to its metrics
+    """
+    return embedding_registry.get_metrics()
+
+
+@router.get("/extraction")
+async def get_extraction_metrics(
+    executor: Annotated[ExtractionExecutor, Depends(get_extraction_executor)],
+) -> dict:
+    """
+    Report worker pool sizes and extraction slot utilisation
+
+    Args:
+        executor: Injected ExtractionExecutor instance
+
+    Returns:
+        Pool configuration with in-flight and rejected extraction counts
+    """
+    return executor.get_metrics()
+
+
+@router.get("/document-cache")
+async def get_document_cache_metrics(
+    document_cache: Annotated[DocumentCache, Depends(get_document_cache)],
+) -> dict:
+    """
+    Report hit/miss counts of the content-addressed document cache
+
+    Args:
+        document_cache: Injected DocumentCache instance
+
+    Returns:
+        Hit and miss counters with the hit rate and entry TTL
+    """
+    return document_cache.get_metrics()
+
+
+@router.get("/sessions")
+async def get_session_metrics(
+    session_manager: Annotated[SessionManager, Depends(get_session_manager)],
+) -> dict:
+    """
+    Report live sessions, their approximate memory and eviction counters
+
+    Args:
+        session_manager: Injected SessionManager instance
+
+    Returns:
+        Live session count across workers, the sessions cached by this
+        worker, TTL/capacity settings, eviction counts and per-session
+        age, idle time and approximate size
+    """
+    # Reads the shared live-session count from Redis
+    return await asyncio.to_thread(session_manager.get_stats)
+
+
+@router.get("/semantic-cache")
+async def get_semantic_cache_metrics(
+    semantic_cache: Annotated[SemanticCache, Depends(get_semantic_cache)],
+) -> dict:
+    """
+    Report hit rate of the per-session semantic answer cache
+
+    Args:
+        semantic_cache: Injected SemanticCache instance
+
+    Returns:
+        Hit, miss and bypass counters with the similarity threshold and TTL
+    """
+    return semantic_cache.get_metrics()
+
+
+@router.get("/query")
+async def get_query_metrics_report(
+    query_metrics: Annotated[QueryLatencyMetrics, Depends(get_query_metrics)],
+) -> dict:
+    """
+    Report latency of the query stages that precede the first LLM token
+
+    Args:
+        query_metrics: Injected QueryLatencyMetrics instance
+
+    Returns:
+        Count, average, last and max seconds for embed, search and prompt
+        build, and the token size of the assembled prompts
+    """
+    return query_metrics.get_metrics()
+
+
+@router.get("/redis-pool")
+async def get_redis_pool_metrics() -> dict:
+    """
+    Report connection usage of the process-wide Redis pools
+
+    Returns:
+        Health check settings and, per sync/async and text/binary pool, the
+        connection limit with created, in-use and idle connection counts
+    """
+    return get_pool_metrics()
@@ -1,38 +1,88 @@
-from typing import Annotated
+from typing import Annotated, List, Optional
 from fastapi import APIRouter, HTTPException, Depends
-from app.models.request import QueryRequest
+from app.models.request import QueryRequest, RetrievalMode
 from app.models.response import QueryResponse, Status
-from app.utils.dependencies import get_session_manager
+from app.utils.chains.query_chain import QueryChain, QueryLatencyMetrics
+from app.utils.dependencies import (
+    get_job_manager,
+    get_query_metrics,
+    get_semantic_cache,
+    get_session_manager,
+    get_transaction_store,
+)
 from fastapi.responses import StreamingResponse
+from app.utils.job_manager import JobManager
+from app.utils.semantic_cache import SemanticCache
 from app.utils.session_manager import SessionManager
-from app.utils.chains.query_chain import QueryChain
+from app.utils.transaction_store import TransactionStore
+import asyncio
+import time
+import numpy as np
 
 
 router = APIRouter(prefix="/api/query", tags=["query"])
 
 
+async def _replay_cached_answer(events: List[str]):
+    for event in events:
+        yield event
+
+
+async def _stream_and_cache_answer(
+    query_chain: QueryChain,
+    prompt: str,
+    session_id: str,
+    prompt_vector: np.ndarray,
+    semantic_cache: SemanticCache,
+    transaction_facts: Optional[str],
+    retrieval_mode: RetrievalMode,
+    cacheable: bool,
+):
+    events = []
+    async for event in query_chain.generate_response(
+        prompt, prompt_vector, transaction_facts, retrieval_mode
+    ):
+        events.append(event)
+        yield event
+    # Only complete answers reach this point; failed streams raise above.
+    # Answers over a partially indexed statement are not worth replaying.
+    if cacheable:
+        await asyncio.to_thread(
+            semantic_cache.store, session_id, prompt_vector, events, retrieval_mode
+        )
+
+
 @router.post("", response_model=QueryResponse)
 async def query_document(
     request: QueryRequest,
     session_manager: Annotated[SessionManager, Depends(get_session_manager)],
+    job_manager: Annotated[JobManager, Depends(get_job_manager)],
+    semantic_cache: Annotated[SemanticCache, Depends(get_semantic_cache)],
+    transaction_store: Annotated[TransactionStore, Depends(get_transaction_store)],
+    query_metrics: Annotated[QueryLatencyMetrics, Depends(get_query_metrics)],
 ) -> StreamingResponse:
     """
     Query the extracted document using natural language
 
     Args:
-        request: QueryRequest containing session_id and prompt
+        request: QueryRequest containing session_id, prompt and retrieval mode
         session_manager: Injected SessionManager instance
-        QueryChain: Injected QueryChain class
+        job_manager: Injected JobManager instance
+        semantic_cache: Injected SemanticCache replaying answers to similar prompts
+        transaction_store: Injected TransactionStore computing exact aggregates
+        query_metrics: Injected QueryLatencyMetrics recording the prompt encode
 
     Returns:
         QueryResponse with the answer to the query
 
     Raises:
-        HTTPException: If session doesn't exist or query fails
+        HTTPException: If session doesn't exist, has no searchable chunks
+            yet (409) or query fails
     """
     try:
         session_id = request.session_id
-        if not session_manager.session_exists(session_id):
+        # Session and job state live in Redis; keep those round trips off the loop
+        if not await asyncio.to_thread(session_manager.session_exists, session_id):
             raise HTTPException(
                 status_code=404,
                 detail=QueryResponse(
@@ -43,17 +93,57 @@ async def query_document(
                 ).model_dump(mode="json"),
             )
 
-        retrievers = session_manager.get_session_retreivers_by_id(session_id)
-        transactions_retreiver = retrievers["transactions_retreiver"]
-        full_text_retreiver = retrievers["full_text_retreiver"]
+        if not await asyncio.to_thread(job_manager.is_queryable, session_id):
+            job = await asyncio.to_thread(job_manager.get_job, session_id)
+            raise HTTPException(
+                status_code=409,
+                detail=QueryResponse(
+                    status=Status.FAILURE,
+                    response="",
+                    description=f"Session is not ready yet (stage: {job.stage.value})",
+                    session_id=session_id,
+                ).model_dump(mode="json"),
+            )
+
+        # Encoded once here for the cache lookup and reused by the chain
+        embed_start = time.perf_counter()
+        prompt_vector = await asyncio.to_thread(
+            semantic_cache.embed_prompt, request.prompt
+        )
+        query_metrics.record("embed", time.perf_counter() - embed_start)
+        if request.bypass_cache:
+            semantic_cache.record_bypass()
+        else:
+            cached_events = await asyncio.to_thread(
+                semantic_cache.lookup, session_id, prompt_vector, request.retrieval_mode
+            )
+            if cached_events is not None:
+                return StreamingResponse(
+                    _replay_cached_answer(cached_events),
+                    media_type="text/event-stream"
+                )
 
-        query_chain = QueryChain(
-            transactions_retriever=transactions_retreiver,
-            full_text_retriever=full_text_retreiver,
+        # Totals, counts and top merchants are computed, not read off chunks
+        transaction_facts = await asyncio.to_thread(
+            transaction_store.answer, session_id, request.prompt
+        )
+        # May rebuild the retreivers from Redis and load their in-memory index
+        query_chain = await asyncio.to_thread(
+            session_manager.get_query_chain, session_id
         )
+        cacheable = await asyncio.to_thread(job_manager.is_ready, session_id)
 
         return StreamingResponse(
-            query_chain.generate_response(request.prompt),
+            _stream_and_cache_answer(
+                query_chain,
+                request.prompt,
+                session_id,
+                prompt_vector,
+                semantic_cache,
+                transaction_facts,
+                request.retrieval_mode,
+                cacheable,
+            ),
             media_type="text/event-stream"
         )
 
@@ -1,11 +1,41 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.controllers import extraction_controller, query_controller
+from app.controllers import extraction_controller, metrics_controller, query_controller
+from app.utils.embedding_registry import EmbeddingRegistry
+from app.utils.extraction_executor import ExtractionExecutor
+from app.utils.session_manager import SessionManager
+
+SESSION_SWEEP_INTERVAL_SECONDS = int(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "60"))
+
+
+async def sweep_expired_sessions():
+    session_manager = SessionManager()
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL_SECONDS)
+        session_manager.evict_expired()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the embedding model before the first upload instead of on it
+    if os.getenv("PRELOAD_EMBEDDING_MODEL", "true").lower() == "true":
+        EmbeddingRegistry().preload()
+    sweeper = asyncio.create_task(sweep_expired_sessions())
+    yield
+    sweeper.cancel()
+    with suppress(asyncio.CancelledError):
+        await sweeper
+    ExtractionExecutor().shutdown()
+
 
 app = FastAPI(
     title="FastAPI Server",
     version="1.0.0",
     description="A simple FastAPI application with MVC architecture",
+    lifespan=lifespan,
 )
 
 
@@ -19,6 +49,7 @@ app.add_middleware(
 
 app.include_router(extraction_controller.router)
 app.include_router(query_controller.router)
+app.include_router(metrics_controller.router)
 
 @app.get("/")
 async def root():
@@ -2,6 +2,13 @@ from enum import Enum
 from pydantic import BaseModel
 
 
+class RetrievalMode(str, Enum):
+    VECTOR = "vector"
+    HYBRID = "hybrid"
+
+
 class QueryRequest(BaseModel):
     session_id: str
-    prompt: str
\ No newline at end of file
+    prompt: str
+    bypass_cache: bool = False
+    retrieval_mode: RetrievalMode = RetrievalMode.VECTOR
@@ -7,11 +7,29 @@ class Status(str, Enum):
     FAILURE="fail"
 
 
+class ExtractionStage(str, Enum):
+    QUEUED="queued"
+    PARSING="parsing"
+    EMBEDDING="embedding"
+    READY="ready"
+    FAILED="failed"
+
+
 class ExtractionResponse(BaseModel):
     status: Status
     session_id: str
     description: Optional[str] = None
     
+class ExtractionStatusResponse(BaseModel):
+    status: Status
+    session_id: str
+    stage: ExtractionStage
+    pages_parsed: int = 0
+    tables_found: int = 0
+    chunks_embedded: int = 0
+    indexed: bool = False
+    description: Optional[str] = None
+
 class QueryResponse(BaseModel):
     status: Status
     response: str
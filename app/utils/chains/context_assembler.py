@@ -0,0 +1,128 @@
+from typing import List, NamedTuple, Tuple
+from langchain_core.documents import Document
+from dotenv import load_dotenv
+import os
+import re
+
+load_dotenv()
+
+# Tokens of retrieved material allowed into the prompt, across both sections
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+
+EMPTY_SECTION_TEXT = "No matching records found."
+# Chunks are cut down to the remaining budget only if this many tokens fit
+MIN_TRUNCATED_TOKENS = int(os.getenv("MIN_TRUNCATED_TOKENS", "32"))
+
+# Words, numbers and individual symbols; close to BPE counts for statement text
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count without loading a tokenizer"""
+    return len(_TOKEN_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text holding at most max_tokens estimated tokens"""
+    if max_tokens <= 0:
+        return ""
+    for count, match in enumerate(_TOKEN_RE.finditer(text), start=1):
+        if count == max_tokens:
+            return text[:match.end()]
+    return text
+
+
+class AssembledContext(NamedTuple):
+    transactions: str
+    full_text: str
+    context_tokens: int
+    chunks_used: int
+    chunks_dropped: int
+    chunks_truncated: int = 0
+
+
+class ContextAssembler:
+    """
+    Fits retrieved chunks from both indexes into a fixed token budget
+
+    Chunks are ranked together by vector distance, so the budget goes to the
+    closest matches whichever index they came from. Repeated chunks (the
+    same transaction in both indexes, overlapping text splits) are kept once.
+    A chunk larger than the remaining budget, such as a whole transaction
+    table, is cut down to fit rather than dropped.
+    """
+
+    def __init__(self, token_budget: int = CONTEXT_TOKEN_BUDGET) -> None:
+        self.token_budget = token_budget
+
+    def assemble(
+        self,
+        transactions: List[Tuple[Document, float]],
+        full_text: List[Tuple[Document, float]],
+    ) -> AssembledContext:
+        """
+        Select chunks closest-first until the token budget is spent
+
+        Args:
+            transactions: (document, distance) pairs from the transactions index
+            full_text: (document, distance) pairs from the full text index
+
+        Returns:
+            AssembledContext with the plain-text sections and token accounting
+        """
+        candidates = [
+            (distance, "transactions", doc) for doc, distance in transactions
+        ] + [(distance, "full_text", doc) for doc, distance in full_text]
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        sections = {"transactions": [], "full_text": []}
+        selected_texts: List[str] = []
+        used_tokens = 0
+        dropped = 0
+        truncated = 0
+
+        for _, section, doc in candidates:
+            text = _WHITESPACE_RE.sub(" ", doc.page_content).strip()
+            if not text or any(text in kept for kept in selected_texts):
+                dropped += 1
+                continue
+
+            tokens = estimate_tokens(text)
+            remaining = self.token_budget - used_tokens
+            if tokens > remaining:
+                if remaining < MIN_TRUNCATED_TOKENS:
+                    # A smaller, further chunk may still fit
+                    dropped += 1
+                    continue
+                text = truncate_to_tokens(text, remaining)
+                tokens = remaining
+                truncated += 1
+
+            # Drop chunks already kept that are contained in this one
+            for kept in [kept for kept in selected_texts if kept in text]:
+                selected_texts.remove(kept)
+                for section_texts in sections.values():
+                    if kept in section_texts:
+                        section_texts.remove(kept)
+                        used_tokens -= estimate_tokens(kept)
+                        dropped += 1
+
+            selected_texts.append(text)
+            sections[section].append(text)
+            used_tokens += tokens
+
+        return AssembledContext(
+            transactions=self._format_section(sections["transactions"], "- "),
+            full_text=self._format_section(sections["full_text"], ""),
+            context_tokens=used_tokens,
+            chunks_used=len(selected_texts),
+            chunks_dropped=dropped,
+            chunks_truncated=truncated,
+        )
+
+    def _format_section(self, texts: List[str], bullet: str) -> str:
+        if not texts:
+            return EMPTY_SECTION_TEXT
+        separator = "\n" if bullet else "\n\n"
+        return separator.join(f"{bullet}{text}" for text in texts)
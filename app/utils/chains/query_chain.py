@@ -1,19 +1,183 @@
 from langchain_core.prompts import PromptTemplate
-from langchain_core.runnables import (
-    RunnableLambda,
-    RunnableParallel,
-    RunnablePassthrough,
-)
+from langchain_core.runnables import RunnableLambda
 from langchain_groq import ChatGroq
 from langchain_core.output_parsers import StrOutputParser
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from app.models.request import RetrievalMode
+from app.utils.chains.context_assembler import ContextAssembler, estimate_tokens
+from app.utils.decorators.singleton import singleton
+from app.utils.embedding_registry import EmbeddingRegistry
 from app.utils.retreiver import Retreiver
+import asyncio
+import httpx
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+LLM_MODEL = "openai/gpt-oss-120b"
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "60"))
+
+# Built once per process and shared by every session's chain
+FINANCE_PROMPT = PromptTemplate(
+    input_variables=["transactions", "full_text", "user_query"],
+    template="""
+            You are a professional financial advisor specializing in personal finance, credit card usage, and budgeting.
+            You are provided with the user's credit card statement and a structured list of transactions.
+
+            ---
+            📄 Full Statement:
+            {full_text}
+
+            💳 Transactions (structured):
+            {transactions}
+            ---
+
+            Your task:
+            - Base all answers ONLY on the above statement and transactions.
+            - If information is missing, politely explain what can/cannot be inferred.
+            - Provide responses in a structured, easy-to-read format (use bullet points, categories, or tables if helpful).
+            - Highlight key insights: spending categories, recurring charges, unusual expenses, or savings opportunities.
+            - Offer actionable financial advice where relevant, but do not invent transactions not listed in the data.
+            - Also highlight any EMI spends and interest charged if found ONLY.
+            - Give the report/answer in a rich markdown format with proper line breaks and indentation.
+            
+            QUESTION: {user_query}
+
+            IMPORTANT OUTPUT RULES:
+            - Start each section with ### followed by a space and title
+            - Add blank line after each header
+            - Add blank line before bullet lists
+            - Add blank line after bullet lists
+            - Use * for bullet points with a space after
+
+            CRITICAL: You MUST format your response EXACTLY like this example. Add blank lines between sections.
+
+            ### Section Name
+
+            Explanation text here with proper spacing.
+
+            #### Subsection
+
+            * Point one
+            * Point two
+            * Point three
+
+            Another paragraph here.
+
+            ### Another Section
+
+            More content here.
+
+            Now answer the question. Remember: blank line after headers, blank line before lists, blank line after lists.
+        """,
+)
+
+
+QUERY_STAGES = ("embed", "search", "prompt_build")
+
+_shared_llm = None
+_shared_llm_lock = threading.Lock()
+
+
+def get_shared_llm() -> ChatGroq:
+    """
+    Process-wide ChatGroq client
+
+    Uses pooled keep-alive HTTP clients so successive queries reuse open
+    connections to the Groq API instead of paying a new TLS handshake.
+    """
+    global _shared_llm
+    if _shared_llm is None:
+        with _shared_llm_lock:
+            if _shared_llm is None:
+                limits = httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                    keepalive_expiry=LLM_KEEPALIVE_SECONDS,
+                )
+                _shared_llm = ChatGroq(
+                    model=LLM_MODEL,
+                    temperature=0.4,
+                    streaming=True,
+                    http_client=httpx.Client(limits=limits),
+                    http_async_client=httpx.AsyncClient(limits=limits),
+                )
+    return _shared_llm
+
+
+@singleton
+class QueryLatencyMetrics:
+    """Process-wide latency of the stages that run before the first LLM token"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {
+            stage: {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+            for stage in QUERY_STAGES
+        }
+        self._prompts = 0
+        self._prompt_tokens_total = 0
+        self._prompt_tokens_last = 0
+        self._prompt_tokens_max = 0
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            timings = self._stages[stage]
+            timings["count"] += 1
+            timings["total"] += seconds
+            timings["last"] = seconds
+            timings["max"] = max(timings["max"], seconds)
+
+    def record_prompt_tokens(self, tokens: int):
+        with self._lock:
+            self._prompts += 1
+            self._prompt_tokens_total += tokens
+            self._prompt_tokens_last = tokens
+            self._prompt_tokens_max = max(self._prompt_tokens_max, tokens)
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": timings["count"],
+                    "seconds_avg": (
+                        round(timings["total"] / timings["count"], 4)
+                        if timings["count"]
+                        else 0.0
+                    ),
+                    "seconds_last": round(timings["last"], 4),
+                    "seconds_max": round(timings["max"], 4),
+                }
+                for stage, timings in self._stages.items()
+            }
+            prompt_tokens = {
+                "count": self._prompts,
+                "avg": (
+                    round(self._prompt_tokens_total / self._prompts, 1)
+                    if self._prompts
+                    else 0.0
+                ),
+                "last": self._prompt_tokens_last,
+                "max": self._prompt_tokens_max,
+            }
+        return {"stages": stages, "prompt_tokens": prompt_tokens}
 
 
 class QueryChain:
 
     def __init__(
-        self, transactions_retriever: Retreiver, full_text_retriever: Retreiver
+        self,
+        transactions_retriever: Retreiver,
+        full_text_retriever: Retreiver,
+        llm: Optional[BaseChatModel] = None,
+        embedding: Optional[Embeddings] = None,
+        context_assembler: Optional[ContextAssembler] = None,
     ) -> None:
         """
         Initialize query chain with retrievers
@@ -21,92 +185,146 @@ class QueryChain:
         Args:
             transactions_retriever: Retriever for transaction data
             full_text_retriever: Retriever for full text data
+            llm: Chat model to use; defaults to the shared Groq client
+            embedding: Query encoder; defaults to the registry's shared model
+            context_assembler: Fits retrieved chunks into the prompt token budget
         """
         self.transactions_retriever = transactions_retriever
         self.full_text_retriever = full_text_retriever
+        self.llm = llm
+        self.embedding = embedding or EmbeddingRegistry().get_embeddings()
+        self.context_assembler = context_assembler or ContextAssembler()
+        self.metrics = QueryLatencyMetrics()
         self.chain = self._build_chain()
 
     def _build_finance_prompt(self):
-        finance_prompt = PromptTemplate(
-            input_variables=["transactions", "full_text", "user_query"],
-            template="""
-                    You are a professional financial advisor specializing in personal finance, credit card usage, and budgeting.
-                    You are provided with the user's credit card statement and a structured list of transactions.
-
-                    ---
-                    📄 Full Statement:
-                    {full_text}
-
-                    💳 Transactions (structured):
-                    {transactions}
-                    ---
+        return FINANCE_PROMPT
 
-                    Your task:
-                    - Base all answers ONLY on the above statement and transactions.
-                    - If information is missing, politely explain what can/cannot be inferred.
-                    - Provide responses in a structured, easy-to-read format (use bullet points, categories, or tables if helpful).
-                    - Highlight key insights: spending categories, recurring charges, unusual expenses, or savings opportunities.
-                    - Offer actionable financial advice where relevant, but do not invent transactions not listed in the data.
-                    - Also highlight any EMI spends and interest charged if found ONLY.
-                    - Give the report/answer in a rich markdown format with proper line breaks and indentation.
-                    
-                    QUESTION: {user_query}
-
-                    IMPORTANT OUTPUT RULES:
-                    - Start each section with ### followed by a space and title
-                    - Add blank line after each header
-                    - Add blank line before bullet lists
-                    - Add blank line after bullet lists
-                    - Use * for bullet points with a space after
-
-                    CRITICAL: You MUST format your response EXACTLY like this example. Add blank lines between sections.
+    def _build_llm(self):
+        return self.llm or get_shared_llm()
 
-                    ### Section Name
+    async def _retrieve_context(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Encode the prompt once and search both indexes concurrently with it
 
-                    Explanation text here with proper spacing.
+        Args:
+            inputs: {"user_query", "query_vector", "transaction_facts",
+                "retrieval_mode"}; the vector may be None, in which case the
+                prompt is encoded here.
+                When exact transaction facts are given the transactions
+                index is not searched.
 
-                    #### Subsection
+        Returns:
+            The query with (document, distance) pairs from both indexes
+        """
+        query = inputs["user_query"]
+        query_vector = inputs.get("query_vector")
 
-                    * Point one
-                    * Point two
-                    * Point three
+        start = time.perf_counter()
+        # A caller passing the vector times its own encode
+        encoded_here = query_vector is None
+        if encoded_here:
+            query_vector = await asyncio.to_thread(self.embedding.embed_query, query)
+        embedded = time.perf_counter()
 
-                    Another paragraph here.
+        mode = inputs.get("retrieval_mode") or RetrievalMode.VECTOR
+        transaction_facts = inputs.get("transaction_facts")
+        if transaction_facts:
+            transactions = []
+            full_text = await asyncio.to_thread(
+                self._search, self.full_text_retriever, query, query_vector, mode
+            )
+        else:
+            transactions, full_text = await asyncio.gather(
+                asyncio.to_thread(
+                    self._search, self.transactions_retriever, query, query_vector, mode
+                ),
+                asyncio.to_thread(
+                    self._search, self.full_text_retriever, query, query_vector, mode
+                ),
+            )
+        searched = time.perf_counter()
 
-                    ### Another Section
+        if encoded_here:
+            self.metrics.record("embed", embedded - start)
+        self.metrics.record("search", searched - embedded)
+        logger.info(
+            f"Retrieval ({mode.value}) took embed={(embedded - start) * 1000:.1f}ms "
+            f"search={(searched - embedded) * 1000:.1f}ms"
+        )
+        return {
+            "user_query": query,
+            "transactions": transactions,
+            "full_text": full_text,
+            "transaction_facts": transaction_facts,
+        }
 
-                    More content here.
+    def _search(self, retriever: Retreiver, query: str, query_vector, mode):
+        if mode is RetrievalMode.HYBRID:
+            return retriever.hybrid_search(query, query_vector)
+        return retriever.search_by_vector(query_vector)
 
-                    Now answer the question. Remember: blank line after headers, blank line before lists, blank line after lists.
-                """,
+    def _build_prompt(self, retrieved: Dict[str, Any]):
+        start = time.perf_counter()
+        context = self.context_assembler.assemble(
+            retrieved["transactions"], retrieved["full_text"]
         )
-        return finance_prompt
+        transactions = retrieved.get("transaction_facts") or context.transactions
+        prompt = self._build_finance_prompt().invoke(
+            {
+                "user_query": retrieved["user_query"],
+                "transactions": transactions,
+                "full_text": context.full_text,
+            }
+        )
+        seconds = time.perf_counter() - start
+        prompt_tokens = estimate_tokens(prompt.to_string())
 
-    def _build_llm(self):
-        llm = ChatGroq(model="openai/gpt-oss-120b",
-                       temperature=0.4, streaming=True)
-        return llm
+        self.metrics.record("prompt_build", seconds)
+        self.metrics.record_prompt_tokens(prompt_tokens)
+        logger.info(
+            f"Prompt build took {seconds * 1000:.1f}ms: {prompt_tokens} prompt tokens, "
+            f"{context.context_tokens} context tokens from {context.chunks_used} chunks "
+            f"({context.chunks_dropped} dropped, {context.chunks_truncated} truncated)"
+        )
+        return prompt
 
     def _build_chain(self):
 
         chain = (
-            RunnableLambda(lambda x: x)
-            | RunnableParallel(
-                {
-                    "user_query": RunnablePassthrough(),
-                    "transactions": self.transactions_retriever.retreive_using_similarity(),
-                    "full_text": self.full_text_retriever.retreive_using_similarity(),
-                }
-            )
-            | self._build_finance_prompt()
+            RunnableLambda(self._retrieve_context)
+            | RunnableLambda(self._build_prompt)
             | self._build_llm()
             | StrOutputParser()
         )
         return chain
 
-    async def generate_response(self, query: str):
+    async def generate_response(
+        self,
+        query: str,
+        query_vector=None,
+        transaction_facts: Optional[str] = None,
+        retrieval_mode: RetrievalMode = RetrievalMode.VECTOR,
+    ):
+        """
+        Stream the answer to a query as server-sent events
+
+        Args:
+            query: User prompt
+            query_vector: Prompt embedding already computed by the caller,
+                reused for retrieval instead of encoding the prompt again
+            transaction_facts: Exact aggregates over the session's transactions,
+                given to the LLM in place of retrieved transaction chunks
+            retrieval_mode: Pure vector search, or vector fused with BM25
+        """
         try:
-            async for chunk in self.chain.astream(query):
+            inputs = {
+                "user_query": query,
+                "query_vector": query_vector,
+                "transaction_facts": transaction_facts,
+                "retrieval_mode": retrieval_mode,
+            }
+            async for chunk in self.chain.astream(inputs):
                 if chunk:
                     yield f"data: {chunk}\n\n"
         except Exception as e:
@@ -1,61 +1,138 @@
 import os
 from langchain_community.vectorstores.redis import Redis
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from dotenv import load_dotenv
+from app.utils.embedding_registry import EmbeddingRegistry
+from app.utils.redis_pool import use_shared_client
+from app.utils.redisdb import (
+    TRANSACTIONS_INDEX,
+    session_index_key_prefix,
+    session_index_name,
+)
+from app.utils.tools.transaction_line_parser import extract_merchant
+from app.utils.vector_writer import VectorWriter
 load_dotenv()
 
 REDIS_URL = os.getenv("REDIS_URL")
 
+# "row" indexes one narrative per transaction, "table" one document per table
+TRANSACTION_INDEX_MODE = os.getenv("TRANSACTION_INDEX_MODE", "row")
+TRANSACTION_ROW_RETRIEVER_K = int(os.getenv("TRANSACTION_ROW_RETRIEVER_K", "12"))
+TRANSACTION_TABLE_RETRIEVER_K = 4
+
+TRANSACTION_INDEX_SCHEMA = {
+    "text": [{"name": "date"}, {"name": "txn_type"}, {"name": "merchant"}],
+    "numeric": [{"name": "amount"}],
+}
+
 
 class CreateEmbeddings:
 
-    def __init__(self):
-        pass
-
-    def create_embeddings_for_transactions_data(self, transactions_data, session_id):
-        try:
-            transaction_text_data = [
-                t["text"] for t in transactions_data if "text" in t
-            ]
-            embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
-            )
-            rds = Redis.from_texts(
-                texts=transaction_text_data,
-                embedding=embeddings,
-                redis_url=REDIS_URL,
-                index_name=f"transactions_index_{session_id}",
-            )
-            return rds
-        except Exception as e:
-            print(f"Error Embedding and storing in vector DB: {e}")
-
-    def create_embeddings_for_text_data(self, text_data, index_name, session_id):
-        try:
-
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=500,
-                chunk_overlap=50,
-                length_function=len,
-                is_separator_regex=False,
-            )
-
-            embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
-            )
-
-            texts = text_splitter.split_text(text_data)
-
-            rds = Redis.from_texts(
-                texts=texts,
-                embedding=embeddings,
-                redis_url=REDIS_URL,
-                index_name=f"{index_name}_{session_id}",
-            )
-
-            return rds
-
-        except Exception as e:
-            print(f"Error embedding and storing in vector DB: {e}")
-            return None
+    def __init__(self, transaction_index_mode: str = TRANSACTION_INDEX_MODE):
+        self.embedding_registry = EmbeddingRegistry()
+        self.vector_writer = VectorWriter(redis_url=REDIS_URL)
+        self.transaction_index_mode = transaction_index_mode
+
+    @property
+    def transactions_retriever_k(self) -> int:
+        if self.transaction_index_mode == "row":
+            return TRANSACTION_ROW_RETRIEVER_K
+        return TRANSACTION_TABLE_RETRIEVER_K
+
+    def transaction_documents(self, transactions_data):
+        """
+        Build texts and metadata for the transactions index
+
+        In row mode every row of a parsed transaction table becomes its own
+        document (its narrative) with structured date/amount/type/merchant
+        metadata. Tables without a Narrative column are indexed whole.
+        """
+        texts, metadatas = [], []
+        for table in transactions_data:
+            if self.transaction_index_mode != "row" or "Narrative" not in table.columns:
+                texts.append(table.text)
+                metadatas.append({})
+                continue
+
+            for record in table.records():
+                metadata = {
+                    "date": record["Date"],
+                    "txn_type": record["Type"],
+                    "merchant": extract_merchant(record["Description"]),
+                }
+                try:
+                    metadata["amount"] = float(record["Amount"].replace(",", ""))
+                except ValueError:
+                    pass
+                texts.append(record["Narrative"])
+                metadatas.append(metadata)
+        return texts, metadatas
+
+    def embed_transactions_data(self, transactions_data) -> "IndexDocuments":
+        texts, metadatas = self.transaction_documents(transactions_data)
+        return IndexDocuments(texts, metadatas, self.encode(texts))
+
+    def embed_text_data(self, text_data) -> "IndexDocuments":
+        texts = self.split_text(text_data)
+        return IndexDocuments(texts, [{} for _ in texts], self.encode(texts))
+
+    def split_text(self, text_data):
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=500,
+            chunk_overlap=50,
+            length_function=len,
+            is_separator_regex=False,
+        )
+        return text_splitter.split_text(text_data)
+
+    def encode(self, texts):
+        if not texts:
+            return []
+        return self.embedding_registry.get_embeddings().embed_documents(texts)
+
+    def store_documents(
+        self, documents: "IndexDocuments", index_name, session_id, index_schema=None
+    ) -> Redis:
+        """
+        Create a session index and bulk-write already encoded documents to it
+
+        The index is created even when there are no documents so that the
+        session always has a queryable (possibly empty) index. Documents are
+        then written in pipelined batches by the shared VectorWriter.
+        """
+        embeddings = self.embedding_registry.get_embeddings()
+        rds = Redis(
+            redis_url=REDIS_URL,
+            index_name=session_index_name(index_name, session_id),
+            embedding=embeddings,
+            index_schema=index_schema,
+            key_prefix=session_index_key_prefix(index_name, session_id),
+        )
+        use_shared_client(rds, REDIS_URL)
+        rds._create_index_if_not_exist(dim=embeddings.dimension)
+        self.vector_writer.write(
+            rds, documents.texts, documents.metadatas, documents.vectors
+        )
+        return rds
+
+    def store_transactions_documents(self, documents: "IndexDocuments", session_id):
+        return self.store_documents(
+            documents,
+            TRANSACTIONS_INDEX,
+            session_id,
+            index_schema=TRANSACTION_INDEX_SCHEMA,
+        )
+
+
+class IndexDocuments:
+    """Texts, metadata and vectors destined for one session index"""
+
+    __slots__ = ("texts", "metadatas", "vectors")
+
+    def __init__(self, texts, metadatas, vectors):
+        self.texts = texts
+        self.metadatas = metadatas
+        self.vectors = vectors
+
+    def __len__(self):
+        return len(self.texts)
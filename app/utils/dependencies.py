@@ -1,8 +1,15 @@
+from app.utils.chains.query_chain import QueryLatencyMetrics
 from app.utils.create_embeddings import CreateEmbeddings
+from app.utils.document_cache import DocumentCache
 from app.utils.document_extractor import DocumentExtractor
+from app.utils.embedding_registry import EmbeddingRegistry
+from app.utils.extraction_executor import ExtractionExecutor
+from app.utils.job_manager import JobManager
 from app.utils.redisdb import RedisDB
 from app.utils.retreiver import Retreiver
+from app.utils.semantic_cache import SemanticCache
 from app.utils.session_manager import SessionManager
+from app.utils.transaction_store import TransactionStore
 from dotenv import load_dotenv
 import os
 
@@ -12,12 +19,33 @@ REDIS_URL = os.getenv("REDIS_URL")
 def get_document_extractor() -> DocumentExtractor:
     return DocumentExtractor()
 
+def get_document_cache() -> DocumentCache:
+    return DocumentCache(redis_url=REDIS_URL)
+
 def get_embedding() -> CreateEmbeddings:
     return CreateEmbeddings()
 
+def get_embedding_registry() -> EmbeddingRegistry:
+    return EmbeddingRegistry()
+
+def get_extraction_executor() -> ExtractionExecutor:
+    return ExtractionExecutor()
+
+def get_job_manager() -> JobManager:
+    return JobManager()
+
+def get_query_metrics() -> QueryLatencyMetrics:
+    return QueryLatencyMetrics()
+
+def get_semantic_cache() -> SemanticCache:
+    return SemanticCache(redis_url=REDIS_URL)
+
 def get_session_manager() -> SessionManager:
     return SessionManager()
 
+def get_transaction_store() -> TransactionStore:
+    return TransactionStore(redis_url=REDIS_URL)
+
 def get_redis_db() -> RedisDB:
     return RedisDB(redis_url=REDIS_URL)
 
@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import threading
+from array import array
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from app.utils.create_embeddings import IndexDocuments
+from app.utils.decorators.singleton import singleton
+from app.utils.redis_pool import get_redis_client
+from app.utils.document_extractor import EXTRACTOR_VERSION
+from app.utils.tools.extracted_table import ExtractedTable
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+DOCUMENT_CACHE_PREFIX = "doccache"
+DOCUMENT_CACHE_TTL_SECONDS = int(
+    os.getenv("DOCUMENT_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60))
+)
+INDEX_NAMES = ("transactions", "full_text")
+
+logger = logging.getLogger(__name__)
+
+
+def _vectors_to_bytes(vectors) -> bytes:
+    flat = array("f")
+    for vector in vectors:
+        flat.extend(vector)
+    return flat.tobytes()
+
+
+def _vectors_from_bytes(data: bytes, dim: int) -> list:
+    flat = array("f")
+    flat.frombytes(data)
+    return [flat[i:i + dim].tolist() for i in range(0, len(flat), dim)]
+
+
+@singleton
+class DocumentCache:
+    """
+    Content-addressed cache of extracted statements and their embeddings
+
+    Entries are keyed by the PDF's SHA-256 together with the extractor
+    version, embedding model and transaction index mode, so a re-uploaded
+    statement skips parsing and encoding entirely.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL):
+        # Binary client: vectors are stored as raw float32 bytes
+        self.client = get_redis_client(redis_url)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_key(self, document_hash: str, model_name: str, index_mode: str) -> str:
+        return (
+            f"{DOCUMENT_CACHE_PREFIX}:{EXTRACTOR_VERSION}:{model_name}:"
+            f"{index_mode}:{document_hash}"
+        )
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            entry = self.client.hgetall(key)
+        except Exception as e:
+            logger.warning(f"Document cache lookup failed: {e}")
+            entry = {}
+
+        cached = None
+        if entry:
+            try:
+                cached = self._decode(entry)
+            except Exception as e:
+                # Truncated or malformed entries are dropped and re-extracted
+                logger.warning(f"Discarding unreadable document cache entry {key}: {e}")
+                try:
+                    self.client.delete(key)
+                except Exception as e:
+                    logger.warning(f"Document cache delete failed: {e}")
+
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return cached
+
+    def _decode(self, entry: dict) -> dict:
+        payload = json.loads(entry[b"payload"])
+        dim = int(entry[b"dim"])
+        documents = {}
+        for name in INDEX_NAMES:
+            texts = payload[name]["texts"]
+            vectors = _vectors_from_bytes(entry[f"{name}_vectors".encode()], dim)
+            if len(vectors) != len(texts) or (vectors and len(vectors[-1]) != dim):
+                raise ValueError(f"{name} vectors do not match its {len(texts)} texts")
+            documents[name] = IndexDocuments(texts, payload[name]["metadatas"], vectors)
+        extraction = payload["extraction"]
+        extraction["tables_data"] = {
+            table_type: [ExtractedTable.from_dict(t) for t in tables]
+            for table_type, tables in extraction["tables_data"].items()
+        }
+        return {"extraction": extraction, **documents}
+
+    def put(self, key: str, extraction: dict, dim: int, **documents: IndexDocuments):
+        """Store an extraction result and the documents of each index"""
+        payload = {
+            "extraction": {
+                "full_text": extraction["full_text"],
+                "metadata": extraction["metadata"],
+                "tables_data": {
+                    table_type: [t.to_dict() for t in tables]
+                    for table_type, tables in extraction["tables_data"].items()
+                },
+            },
+        }
+        mapping = {"dim": dim}
+        for name in INDEX_NAMES:
+            payload[name] = {
+                "texts": documents[name].texts,
+                "metadatas": documents[name].metadatas,
+            }
+            mapping[f"{name}_vectors"] = _vectors_to_bytes(documents[name].vectors)
+        mapping["payload"] = json.dumps(payload)
+
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            pipeline.hset(key, mapping=mapping)
+            pipeline.expire(key, DOCUMENT_CACHE_TTL_SECONDS)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Document cache write failed: {e}")
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "ttl_seconds": DOCUMENT_CACHE_TTL_SECONDS,
+            }
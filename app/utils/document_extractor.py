@@ -1,7 +1,10 @@
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_core.runnables import RunnableParallel, RunnableLambda
+import queue
+
 from app.utils.decorators.singleton import singleton
-from app.utils.tools.table_extractor import TableExtractionTool
+from app.utils.tools.table_extractor import PdfSource, TABLE_TYPES, TableExtractionTool
+
+# Bump whenever extraction output changes so cached documents are re-parsed
+EXTRACTOR_VERSION = "3"
 
 
 @singleton
@@ -10,36 +13,66 @@ class DocumentExtractor:
     def __init__(self):
         self.table_extractor_tool = TableExtractionTool()
         
-    def extract_statement(self, pdf_path):
-        
-        extraction_chain = (
-            RunnableLambda(lambda x: x) # pass through input
-            | RunnableParallel({
-                "full_text": RunnableLambda(self._extract_text),
-                "tables_data": RunnableLambda(self._extract_tables),
-                "metadata": RunnableLambda(self._create_metadata)
-            })
-        )
-        return extraction_chain.invoke(pdf_path)
-    
-    def _extract_text(self, pdf_path):
-        
-        loader = PyPDFLoader(pdf_path)
-        docs = loader.load()
-        return "\n".join([page.page_content for page in docs])
-        
-    def _extract_tables(self, pdf_path):
-        return self.table_extractor_tool.run(pdf_path)
+    def extract_statement(self, source: PdfSource, source_name: str = None):
+        """
+        Extract full text, tables and metadata in a single pass over the PDF
+
+        Each page is parsed once; its text is reused for the structured
+        transaction parsing instead of being extracted again. Pages are parsed
+        serially in the calling process; uploads are sharded across parser
+        processes by the extraction pipeline instead. The source may be a path
+        or the uploaded bytes, which the page parser reads from memory.
+        """
+        tables = {table_type: [] for table_type in TABLE_TYPES}
+        pages = list(self.table_extractor_tool.iter_pages(source))
+
+        for page in pages:
+            for table_type, table in page["tables"]:
+                tables[table_type].append(table)
+
+        return {
+            "full_text": "\n".join(page["text"] for page in pages),
+            "tables_data": tables,
+            "metadata": self._create_metadata(
+                source_name or (source if isinstance(source, str) else None),
+                len(pages),
+            ),
+        }
     
-    def _create_metadata(self,pdf_path):
-        with open(pdf_path, 'rb') as f:
-            pages = f.read().count(b'/Type/Page')
-        
+    def _create_metadata(self, source_name, total_pages):
         return {
-            'source': pdf_path,
+            'source': source_name,
             'document_type': 'bank_statement',
-            'total_pages': pages
+            'total_pages': total_pages
         }
-    
-    
-    
\ No newline at end of file
+
+
+def stream_statement_in_process(
+    source: PdfSource,
+    page_queue,
+    put_timeout: float,
+    start: int = 0,
+    end: int = None,
+):
+    """
+    Process-pool entry point putting each parsed page of [start, end) on a queue
+
+    A None sentinel follows the last page. Gives up if the consumer stops
+    taking pages for put_timeout seconds, so a failed job never pins a
+    worker.
+
+    Returns:
+        Number of pages parsed
+    """
+    tool = DocumentExtractor().table_extractor_tool
+    total_pages = 0
+    try:
+        for page in tool.iter_pages(source, start, end):
+            page_queue.put(page, timeout=put_timeout)
+            total_pages += 1
+    finally:
+        try:
+            page_queue.put(None, timeout=put_timeout)
+        except queue.Full:
+            pass
+    return total_pages
@@ -0,0 +1,198 @@
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List
+
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+from app.utils.decorators.singleton import singleton
+from app.utils.encoders import EMBEDDING_BACKEND, ENCODER_THREADS, create_encoder
+
+load_dotenv()
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+# Prompt vectors kept per model; 0 disables the query cache
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    Cache key for a prompt
+
+    all-MiniLM-L6-v2 lowercases its input, so case and runs of whitespace
+    do not change the vector and are folded here.
+    """
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip().lower()
+
+
+class InstrumentedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that records per-batch encode timings
+
+    Query vectors are kept in an LRU keyed by the normalised prompt, shared
+    by every session using the model, so repeated prompts skip the encoder.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        embeddings: Embeddings,
+        load_seconds: float,
+        backend: str = EMBEDDING_BACKEND,
+        query_cache_size: int = QUERY_EMBEDDING_CACHE_SIZE,
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.embeddings = embeddings
+        self.load_seconds = load_seconds
+        self._lock = threading.Lock()
+        self._dimension = None
+        self._batches = 0
+        self._texts = 0
+        self._encode_seconds = 0.0
+        self._last_batch_seconds = 0.0
+        self._max_batch_seconds = 0.0
+        self.query_cache_size = query_cache_size
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_cache_hits = 0
+        self._query_cache_misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        vectors = self.embeddings.embed_documents(texts)
+        self._record(len(texts), time.perf_counter() - start)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.query_cache_size <= 0:
+            return self._encode_query(text)
+
+        key = normalize_prompt(text)
+        with self._lock:
+            vector = self._query_cache.get(key)
+            if vector is not None:
+                self._query_cache.move_to_end(key)
+                self._query_cache_hits += 1
+                return list(vector)
+            self._query_cache_misses += 1
+
+        vector = self._encode_query(text)
+        with self._lock:
+            self._query_cache[key] = vector
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return list(vector)
+
+    def _encode_query(self, text: str) -> List[float]:
+        start = time.perf_counter()
+        vector = self.embeddings.embed_query(text)
+        self._record(1, time.perf_counter() - start)
+        return vector
+
+    @property
+    def version(self) -> str:
+        """Model and backend; vectors from different backends are not interchangeable"""
+        return f"{self.model_name}@{self.backend}"
+
+    @property
+    def dimension(self) -> int:
+        """Vector size of the model, probed once with a throwaway query"""
+        if self._dimension is None:
+            self._dimension = len(self.embeddings.embed_query("dimension"))
+        return self._dimension
+
+    def _record(self, count: int, elapsed: float):
+        with self._lock:
+            self._batches += 1
+            self._texts += count
+            self._encode_seconds += elapsed
+            self._last_batch_seconds = elapsed
+            self._max_batch_seconds = max(self._max_batch_seconds, elapsed)
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            lookups = self._query_cache_hits + self._query_cache_misses
+            return {
+                "model_name": self.model_name,
+                "backend": self.backend,
+                "load_seconds": round(self.load_seconds, 4),
+                "batches": self._batches,
+                "texts": self._texts,
+                "encode_seconds_total": round(self._encode_seconds, 4),
+                "encode_seconds_avg_batch": (
+                    round(self._encode_seconds / self._batches, 4)
+                    if self._batches
+                    else 0.0
+                ),
+                "encode_seconds_last_batch": round(self._last_batch_seconds, 4),
+                "encode_seconds_max_batch": round(self._max_batch_seconds, 4),
+                "query_cache": {
+                    "size": len(self._query_cache),
+                    "max_size": self.query_cache_size,
+                    "hits": self._query_cache_hits,
+                    "misses": self._query_cache_misses,
+                    "hit_rate": (
+                        round(self._query_cache_hits / lookups, 4) if lookups else 0.0
+                    ),
+                },
+            }
+
+
+@singleton
+class EmbeddingRegistry:
+    """Process-wide registry that loads each embedding model only once"""
+
+    def __init__(self, backend: str = EMBEDDING_BACKEND):
+        self.backend = backend
+        self._models: Dict[str, InstrumentedEmbeddings] = {}
+        self._lock = threading.Lock()
+
+    def get_embeddings(
+        self, model_name: str = DEFAULT_EMBEDDING_MODEL
+    ) -> InstrumentedEmbeddings:
+        embeddings = self._models.get(model_name)
+        if embeddings is not None:
+            return embeddings
+
+        with self._lock:
+            # Another caller may have loaded the model while we waited
+            embeddings = self._models.get(model_name)
+            if embeddings is None:
+                start = time.perf_counter()
+                model = create_encoder(
+                    model_name, self.backend, EMBEDDING_BATCH_SIZE, ENCODER_THREADS
+                )
+                load_seconds = time.perf_counter() - start
+                logger.info(
+                    f"Loaded embedding model {model_name} ({self.backend}) "
+                    f"in {load_seconds:.2f}s"
+                )
+                embeddings = InstrumentedEmbeddings(
+                    model_name, model, load_seconds, self.backend
+                )
+                self._models[model_name] = embeddings
+        return embeddings
+
+    def preload(self, model_name: str = DEFAULT_EMBEDDING_MODEL):
+        self.get_embeddings(model_name)
+
+    def loaded_models(self) -> List[InstrumentedEmbeddings]:
+        """Every embedding model loaded so far"""
+        return list(self._models.values())
+
+    def get_metrics(self) -> dict:
+        return {
+            name: embeddings.get_metrics()
+            for name, embeddings in list(self._models.items())
+        }
@@ -0,0 +1,137 @@
+import os
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+load_dotenv()
+
+# "torch" (sentence-transformers), "onnx" (fp32) or "onnx-int8" (quantized)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+# Intra-op threads of the encoder; unset keeps the runtime's default
+ENCODER_THREADS = int(os.getenv("ENCODER_THREADS", "0")) or None
+# ONNX exports published alongside the model on the Hugging Face hub
+ONNX_MODEL_FILE = os.getenv("ONNX_MODEL_FILE", "onnx/model.onnx")
+ONNX_QUANTIZED_MODEL_FILE = os.getenv(
+    "ONNX_QUANTIZED_MODEL_FILE", "onnx/model_quint8_avx2.onnx"
+)
+# Token limit all-MiniLM-L6-v2 was trained with
+MAX_SEQUENCE_LENGTH = 256
+
+
+class OnnxSentenceEncoder(Embeddings):
+    """
+    Sentence-transformers encoder running an ONNX export on ONNX Runtime
+
+    Reproduces the all-MiniLM-L6-v2 pipeline (tokenize, transformer, mean
+    pooling over the attention mask, L2 normalisation) without PyTorch, so
+    CPU-only nodes can use the int8-quantized export.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        model_file: str = ONNX_MODEL_FILE,
+        batch_size: int = 64,
+        threads: Optional[int] = ENCODER_THREADS,
+    ):
+        try:
+            import onnxruntime
+            from huggingface_hub import hf_hub_download
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError(
+                "The ONNX embedding backend needs onnxruntime, tokenizers and "
+                "huggingface_hub: pip install onnxruntime"
+            ) from e
+
+        self.model_name = model_name
+        self.model_file = model_file
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(hf_hub_download(model_name, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQUENCE_LENGTH)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.inter_op_num_threads = 1
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            hf_hub_download(model_name, model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._encode(texts[start:start + self.batch_size]).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            inputs["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        token_embeddings = self.session.run(None, inputs)[0]
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+def _torch_encoder(model_name: str, batch_size: int, threads: Optional[int]) -> Embeddings:
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    if threads:
+        import torch
+
+        torch.set_num_threads(threads)
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        encode_kwargs={"batch_size": batch_size},
+    )
+
+
+def _onnx_encoder(model_name: str, batch_size: int, threads: Optional[int]) -> Embeddings:
+    return OnnxSentenceEncoder(model_name, ONNX_MODEL_FILE, batch_size, threads)
+
+
+def _onnx_int8_encoder(model_name: str, batch_size: int, threads: Optional[int]) -> Embeddings:
+    return OnnxSentenceEncoder(model_name, ONNX_QUANTIZED_MODEL_FILE, batch_size, threads)
+
+
+ENCODER_BACKENDS: Dict[str, Callable[[str, int, Optional[int]], Embeddings]] = {
+    "torch": _torch_encoder,
+    "onnx": _onnx_encoder,
+    "onnx-int8": _onnx_int8_encoder,
+}
+
+
+def create_encoder(
+    model_name: str,
+    backend: str = EMBEDDING_BACKEND,
+    batch_size: int = 64,
+    threads: Optional[int] = ENCODER_THREADS,
+) -> Embeddings:
+    """
+    Build the encoder for a model on the requested backend
+
+    Every backend is a langchain Embeddings, so the registry, the writers
+    and the retrievers work with any of them unchanged.
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend {backend!r}, expected one of {sorted(ENCODER_BACKENDS)}"
+        )
+    return ENCODER_BACKENDS[backend](model_name, batch_size, threads)
@@ -0,0 +1,96 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from dotenv import load_dotenv
+
+from app.utils.decorators.singleton import singleton
+
+load_dotenv()
+
+EXTRACTION_PROCESS_WORKERS = int(os.getenv("EXTRACTION_PROCESS_WORKERS", "2"))
+EXTRACTION_IO_WORKERS = int(os.getenv("EXTRACTION_IO_WORKERS", "4"))
+MAX_CONCURRENT_EXTRACTIONS = int(
+    os.getenv("MAX_CONCURRENT_EXTRACTIONS", str(EXTRACTION_PROCESS_WORKERS * 2))
+)
+
+
+class ExtractionPoolSaturated(Exception):
+    """Raised when every extraction slot is already taken"""
+
+
+@singleton
+class ExtractionExecutor:
+    """
+    Runs the blocking parts of the extraction pipeline off the event loop.
+
+    CPU-bound PDF parsing goes to a process pool, blocking embedding and Redis
+    I/O to a thread pool, and the number of in-flight extractions is bounded.
+    """
+
+    def __init__(self):
+        # spawn so workers never inherit torch/tokenizer threads from the parent
+        self.process_pool = ProcessPoolExecutor(
+            max_workers=EXTRACTION_PROCESS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=EXTRACTION_IO_WORKERS,
+            thread_name_prefix="extraction-io",
+        )
+        # Started on first use; serves the queues that stream pages out of workers
+        self._manager = None
+        self.max_concurrent = MAX_CONCURRENT_EXTRACTIONS
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    def acquire_slot(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ExtractionPoolSaturated(
+                f"All {self.max_concurrent} extraction slots are busy"
+            )
+        with self._lock:
+            self._in_flight += 1
+
+    def release_slot(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    async def run_io(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.thread_pool, partial(fn, *args, **kwargs))
+
+    def submit_cpu(self, fn, *args, **kwargs) -> Future:
+        """Start fn in the process pool without waiting for it"""
+        return self.process_pool.submit(fn, *args, **kwargs)
+
+    def create_page_queue(self, maxsize: int):
+        """Bounded queue a process-pool worker can put results on as it goes"""
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context("spawn").Manager()
+            return self._manager.Queue(maxsize)
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "process_workers": EXTRACTION_PROCESS_WORKERS,
+                "io_workers": EXTRACTION_IO_WORKERS,
+                "max_concurrent": self.max_concurrent,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self):
+        self.process_pool.shutdown(wait=False, cancel_futures=True)
+        self.thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
@@ -0,0 +1,399 @@
+import asyncio
+import logging
+import os
+import queue
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+from langchain_community.vectorstores.redis import Redis
+
+from app.models.response import ExtractionStage, Status
+from app.utils.create_embeddings import CreateEmbeddings, IndexDocuments
+from app.utils.document_cache import DocumentCache
+from app.utils.document_extractor import stream_statement_in_process
+from app.utils.embedding_registry import EMBEDDING_BATCH_SIZE
+from app.utils.extraction_executor import ExtractionExecutor
+from app.utils.job_manager import JobManager
+from app.utils.redisdb import FULL_TEXT_INDEX, TRANSACTIONS_INDEX, RedisDB
+from app.utils.retreiver import Retreiver
+from app.utils.session_manager import SessionManager
+from app.utils.tools.table_extractor import TABLE_TYPES, count_pages, page_shards
+from app.utils.transaction_store import TransactionStore, TransactionTable
+from app.utils.vector_writer import WriteStats
+
+load_dotenv()
+
+# Parsed pages buffered between each parser process and the splitter
+PAGE_QUEUE_SIZE = int(os.getenv("PAGE_QUEUE_SIZE", "8"))
+# Chunk batches buffered between splitting, encoding and writing
+BATCH_QUEUE_SIZE = int(os.getenv("BATCH_QUEUE_SIZE", "4"))
+# Seconds the parser waits on a full page queue before giving up
+PAGE_PUT_TIMEOUT_SECONDS = float(os.getenv("PAGE_PUT_TIMEOUT_SECONDS", "120"))
+# Larger statements are not kept for the document cache, bounding memory
+DOCUMENT_CACHE_MAX_CHUNKS = int(os.getenv("DOCUMENT_CACHE_MAX_CHUNKS", "2000"))
+
+logger = logging.getLogger(__name__)
+
+# Document cache fields of each session index
+CACHE_FIELDS = {TRANSACTIONS_INDEX: "transactions", FULL_TEXT_INDEX: "full_text"}
+
+
+class ChunkBatch(NamedTuple):
+    index_name: str
+    texts: List[str]
+    metadatas: List[dict]
+    vectors: Optional[list] = None
+
+
+def _next_page(page_queue, parse_future, stop: threading.Event) -> Optional[dict]:
+    """Block for the next parsed page; None once the parser has finished"""
+    while not stop.is_set():
+        try:
+            return page_queue.get(timeout=0.5)
+        except queue.Empty:
+            if parse_future.done():
+                # Raises if the parser failed before sending its sentinel
+                parse_future.result()
+                return None
+    return None
+
+
+async def _create_session_indexes(
+    session_id: str, executor: ExtractionExecutor, embedding: CreateEmbeddings
+) -> Dict[str, Redis]:
+    """Create both (empty) session indexes so chunks are searchable as they land"""
+    empty = IndexDocuments([], [], [])
+    transactions_rds, full_text_rds = await asyncio.gather(
+        executor.run_io(embedding.store_transactions_documents, empty, session_id),
+        executor.run_io(embedding.store_documents, empty, FULL_TEXT_INDEX, session_id),
+    )
+    return {TRANSACTIONS_INDEX: transactions_rds, FULL_TEXT_INDEX: full_text_rds}
+
+
+async def _write_cached_documents(
+    cached: dict,
+    indexes: Dict[str, Redis],
+    executor: ExtractionExecutor,
+    embedding: CreateEmbeddings,
+):
+    write_stats = await asyncio.gather(
+        *(
+            executor.run_io(
+                embedding.vector_writer.write,
+                indexes[index_name],
+                cached[field].texts,
+                cached[field].metadatas,
+                cached[field].vectors,
+            )
+            for index_name, field in CACHE_FIELDS.items()
+        )
+    )
+    for index_name, stats in zip(CACHE_FIELDS, write_stats):
+        logger.info(f"Wrote {stats.describe()} to {indexes[index_name].index_name}")
+
+
+async def _stream_documents(
+    session_id: str,
+    pdf_bytes: bytes,
+    filename: str,
+    indexes: Dict[str, Redis],
+    executor: ExtractionExecutor,
+    embedding: CreateEmbeddings,
+    job_manager: JobManager,
+) -> dict:
+    """
+    Parse, split, encode and write a statement as a pipeline of stages
+
+    Parser processes put pages on bounded queues; pages are split into
+    chunks, chunks are encoded in batches and batches are written to the
+    session indexes, with bounded queues between the stages. Parsing,
+    encoding and Redis writes of successive pages overlap, and the first
+    batches are searchable while later pages are still being parsed.
+
+    Long statements are split into contiguous page ranges, each streamed
+    by its own parser process onto its own queue. The queues are drained
+    one after the other, so pages still reach the splitter in page order.
+    Only the first range's queue is bounded: later ranges can hold all of
+    their pages, so their parsers run to completion instead of holding a
+    process-pool worker while they wait for earlier ranges to drain.
+
+    Returns:
+        The parsed transaction tables and, for statements small enough to
+        cache, the extraction and encoded documents for the document cache
+    """
+    total_pages = await executor.run_io(count_pages, pdf_bytes)
+    shards = []
+    for start, end in page_shards(total_pages):
+        # Room for every page of the range plus its end-of-range sentinel
+        queue_size = PAGE_QUEUE_SIZE if start == 0 else end - start + 1
+        page_queue = executor.create_page_queue(queue_size)
+        parse_future = executor.submit_cpu(
+            stream_statement_in_process,
+            pdf_bytes,
+            page_queue,
+            PAGE_PUT_TIMEOUT_SECONDS,
+            start,
+            end,
+        )
+        shards.append((page_queue, parse_future))
+    stop = threading.Event()
+    encode_queue: asyncio.Queue = asyncio.Queue(BATCH_QUEUE_SIZE)
+    write_queue: asyncio.Queue = asyncio.Queue(BATCH_QUEUE_SIZE)
+
+    transaction_tables = []
+    cache = {
+        "pages": [],
+        "tables_data": {table_type: [] for table_type in TABLE_TYPES},
+        "documents": {index_name: IndexDocuments([], [], []) for index_name in indexes},
+        "chunks": 0,
+    }
+
+    async def split_pages():
+        pending = {index_name: ChunkBatch(index_name, [], []) for index_name in indexes}
+        for page_queue, parse_future in shards:
+            while True:
+                page = await executor.run_io(_next_page, page_queue, parse_future, stop)
+                if page is None:
+                    break
+
+                page_transactions = [
+                    table
+                    for table_type, table in page["tables"]
+                    if table_type == "transactions"
+                ]
+                transaction_tables.extend(page_transactions)
+                texts, metadatas = embedding.transaction_documents(page_transactions)
+                pending[TRANSACTIONS_INDEX].texts.extend(texts)
+                pending[TRANSACTIONS_INDEX].metadatas.extend(metadatas)
+                chunks = embedding.split_text(page["text"])
+                pending[FULL_TEXT_INDEX].texts.extend(chunks)
+                pending[FULL_TEXT_INDEX].metadatas.extend({} for _ in chunks)
+
+                if cache is not None:
+                    cache["pages"].append(page["text"])
+                    for table_type, table in page["tables"]:
+                        cache["tables_data"][table_type].append(table)
+                await executor.run_io(
+                    job_manager.increment_job,
+                    session_id,
+                    pages_parsed=1,
+                    tables_found=len(page["tables"]),
+                )
+
+                for index_name, batch in pending.items():
+                    if len(batch.texts) >= EMBEDDING_BATCH_SIZE:
+                        await encode_queue.put(batch)
+                        pending[index_name] = ChunkBatch(index_name, [], [])
+
+        for batch in pending.values():
+            if batch.texts:
+                await encode_queue.put(batch)
+        await encode_queue.put(None)
+        await executor.run_io(
+            job_manager.update_job,
+            session_id,
+            stage=ExtractionStage.EMBEDDING,
+            description="Embedding document",
+        )
+
+    async def encode_batches():
+        while (batch := await encode_queue.get()) is not None:
+            vectors = await executor.run_io(embedding.encode, batch.texts)
+            await write_queue.put(batch._replace(vectors=vectors))
+        await write_queue.put(None)
+
+    async def write_batches():
+        nonlocal cache
+        indexed = False
+        write_stats = {index_name: WriteStats(0, 0, 0.0) for index_name in indexes}
+        while (batch := await write_queue.get()) is not None:
+            stats = await executor.run_io(
+                embedding.vector_writer.write,
+                indexes[batch.index_name],
+                batch.texts,
+                batch.metadatas,
+                batch.vectors,
+            )
+            write_stats[batch.index_name] = write_stats[batch.index_name].combined(stats)
+            await executor.run_io(
+                job_manager.increment_job, session_id, chunks_embedded=len(batch.texts)
+            )
+            if not indexed:
+                # The session is queryable from the first written batch
+                await executor.run_io(job_manager.update_job, session_id, indexed=True)
+                indexed = True
+
+            if cache is not None:
+                cache["chunks"] += len(batch.texts)
+                if cache["chunks"] > DOCUMENT_CACHE_MAX_CHUNKS:
+                    logger.info(f"Statement too large to cache for session: {session_id}")
+                    cache = None
+                    continue
+                documents = cache["documents"][batch.index_name]
+                documents.texts.extend(batch.texts)
+                documents.metadatas.extend(batch.metadatas)
+                documents.vectors.extend(batch.vectors)
+
+        # Time spent in the writer only, so this is the Redis write throughput
+        for index_name, stats in write_stats.items():
+            logger.info(f"Wrote {stats.describe()} to {indexes[index_name].index_name}")
+
+    await executor.run_io(
+        job_manager.update_job,
+        session_id,
+        stage=ExtractionStage.PARSING,
+        description="Parsing document",
+    )
+    stages = [
+        asyncio.create_task(stage())
+        for stage in (split_pages, encode_batches, write_batches)
+    ]
+    try:
+        await asyncio.gather(*stages)
+        await asyncio.gather(
+            *(asyncio.wrap_future(parse_future) for _, parse_future in shards)
+        )
+    except BaseException:
+        stop.set()
+        for stage in stages:
+            stage.cancel()
+        # Ranges not yet started never run; running ones give up on their queue
+        for _, parse_future in shards:
+            parse_future.cancel()
+        raise
+
+    if cache is None:
+        return {"transaction_tables": transaction_tables}
+    return {
+        "transaction_tables": transaction_tables,
+        "extraction": {
+            "full_text": "\n".join(cache["pages"]),
+            "tables_data": cache["tables_data"],
+            "metadata": {
+                "source": filename,
+                "document_type": "bank_statement",
+                "total_pages": len(cache["pages"]),
+            },
+        },
+        "documents": {
+            CACHE_FIELDS[index_name]: documents
+            for index_name, documents in cache["documents"].items()
+        },
+    }
+
+
+async def run_extraction_job(
+    session_id: str,
+    pdf_bytes: bytes,
+    filename: str,
+    document_hash: str,
+    executor: ExtractionExecutor,
+    embedding: CreateEmbeddings,
+    document_cache: DocumentCache,
+    redis_db: RedisDB,
+    session_manager: SessionManager,
+    job_manager: JobManager,
+    transaction_store: TransactionStore,
+):
+    """
+    Parse, embed and index an uploaded statement for a session
+
+    Runs as a background task after the upload has been acknowledged. Both
+    session indexes are created and attached to the session first, then
+    filled: a statement seen before (same content hash) is bulk-written
+    from the document cache, anything else is streamed page by page from
+    its in-memory bytes through parsing, encoding and writing. Parsed
+    transaction rows are also stored column-wise for exact aggregate
+    queries. Progress is reported through the JobManager, whose Redis
+    writes run on the IO pool like every other blocking call here; the
+    extraction slot is released whatever the outcome.
+    """
+    try:
+        # The first call loads the model, which takes seconds
+        embeddings = await executor.run_io(embedding.embedding_registry.get_embeddings)
+        cache_key = document_cache.cache_key(
+            document_hash, embeddings.version, embedding.transaction_index_mode
+        )
+        cached = await executor.run_io(document_cache.get, cache_key)
+
+        indexes = await _create_session_indexes(session_id, executor, embedding)
+        retreivers = {
+            "transactions_retreiver": Retreiver(
+                rds=indexes[TRANSACTIONS_INDEX],
+                k=embedding.transactions_retriever_k,
+            ),
+            "full_text_retreiver": Retreiver(rds=indexes[FULL_TEXT_INDEX]),
+        }
+        await executor.run_io(
+            session_manager.add_retreivers_to_session, session_id, retreivers
+        )
+
+        if cached is not None:
+            extraction = cached["extraction"]
+            logger.info(f"Reusing cached extraction for session: {session_id}")
+            await executor.run_io(
+                job_manager.update_job,
+                session_id,
+                stage=ExtractionStage.EMBEDDING,
+                pages_parsed=extraction["metadata"]["total_pages"],
+                tables_found=sum(len(t) for t in extraction["tables_data"].values()),
+                chunks_embedded=len(cached["transactions"]) + len(cached["full_text"]),
+                description="Loading cached embeddings",
+            )
+            await _write_cached_documents(cached, indexes, executor, embedding)
+            transaction_tables = extraction["tables_data"]["transactions"]
+        else:
+            streamed = await _stream_documents(
+                session_id,
+                pdf_bytes,
+                filename,
+                indexes,
+                executor,
+                embedding,
+                job_manager,
+            )
+            transaction_tables = streamed["transaction_tables"]
+            if "extraction" in streamed:
+                await executor.run_io(
+                    document_cache.put,
+                    cache_key,
+                    streamed["extraction"],
+                    embeddings.dimension,
+                    **streamed["documents"],
+                )
+
+        transaction_table = TransactionTable.from_tables(transaction_tables)
+        await executor.run_io(transaction_store.put, session_id, transaction_table)
+
+        # Small, now complete indexes are searched in memory from here on
+        await asyncio.gather(
+            *(executor.run_io(r.load_memory_index) for r in retreivers.values())
+        )
+        await executor.run_io(
+            session_manager.add_retreivers_to_session, session_id, retreivers
+        )
+
+        await executor.run_io(
+            job_manager.update_job,
+            session_id,
+            stage=ExtractionStage.READY,
+            indexed=True,
+            description="Extraction Successful",
+        )
+        logger.info(f"Extraction finished for session: {session_id}")
+
+    except Exception as e:
+        logger.error(f"Error in document extraction: {e}", exc_info=True)
+        await executor.run_io(
+            job_manager.update_job,
+            session_id,
+            status=Status.FAILURE,
+            stage=ExtractionStage.FAILED,
+            description=f"Extraction failed: {str(e)}",
+        )
+        await executor.run_io(redis_db.drop_session, session_id)
+        await executor.run_io(session_manager.delete_session_by_id, session_id)
+
+    finally:
+        executor.release_slot()
@@ -0,0 +1,100 @@
+import os
+import threading
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.models.response import ExtractionStage, ExtractionStatusResponse, Status
+from app.utils.decorators.singleton import singleton
+from app.utils.redisdb import RedisDB, SESSION_TTL_SECONDS, session_job_key
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+FINISHED_STAGES = (ExtractionStage.READY, ExtractionStage.FAILED)
+
+
+@singleton
+class JobManager:
+    """
+    Tracks stage-level progress of background extraction jobs
+
+    The worker running a job keeps it in memory and mirrors every update to
+    Redis, so any worker can report its progress.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL):
+        self.jobs: Dict[str, ExtractionStatusResponse] = {}
+        self.redis_db = RedisDB(redis_url=redis_url)
+        self._lock = threading.Lock()
+
+    def create_job(self, session_id: str) -> ExtractionStatusResponse:
+        job = ExtractionStatusResponse(
+            status=Status.SUCCESS,
+            session_id=session_id,
+            stage=ExtractionStage.QUEUED,
+            description="Extraction queued",
+        )
+        with self._lock:
+            self.jobs[session_id] = job
+            self._save(job)
+        return job
+
+    def update_job(self, session_id: str, **fields):
+        with self._lock:
+            job = self.jobs.get(session_id)
+            if job is None:
+                return
+            for name, value in fields.items():
+                setattr(job, name, value)
+            self._save(job)
+            # Finished jobs only live in Redis from here on
+            if job.stage in FINISHED_STAGES:
+                self.jobs.pop(session_id, None)
+
+    def increment_job(self, session_id: str, **counts: int):
+        """Add to the job's progress counters (pages, tables, chunks)"""
+        with self._lock:
+            job = self.jobs.get(session_id)
+            if job is not None:
+                for name, count in counts.items():
+                    setattr(job, name, getattr(job, name) + count)
+                self._save(job)
+
+    def get_job(self, session_id: str) -> Optional[ExtractionStatusResponse]:
+        data = self.redis_db.client.get(session_job_key(session_id))
+        if data:
+            return ExtractionStatusResponse.model_validate_json(data)
+        with self._lock:
+            job = self.jobs.get(session_id)
+            return job.model_copy() if job else None
+
+    def is_ready(self, session_id: str) -> bool:
+        job = self.get_job(session_id)
+        # Sessions created outside the job flow are considered ready
+        return job is None or job.stage == ExtractionStage.READY
+
+    def is_in_progress(self, session_id: str) -> bool:
+        """Queued or still extracting, on any worker"""
+        job = self.get_job(session_id)
+        return job is not None and job.stage not in FINISHED_STAGES
+
+    def is_queryable(self, session_id: str) -> bool:
+        """Ready, or still extracting but with chunks already searchable"""
+        job = self.get_job(session_id)
+        if job is None or job.stage == ExtractionStage.READY:
+            return True
+        return job.indexed and job.stage != ExtractionStage.FAILED
+
+    def delete_job(self, session_id: str):
+        with self._lock:
+            self.jobs.pop(session_id, None)
+        self.redis_db.client.delete(session_job_key(session_id))
+
+    def _save(self, job: ExtractionStatusResponse):
+        self.redis_db.client.set(
+            session_job_key(job.session_id),
+            job.model_dump_json(),
+            ex=SESSION_TTL_SECONDS,
+        )
@@ -0,0 +1,125 @@
+import os
+import sys
+from typing import List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_community.vectorstores.redis import Redis
+from langchain_core.documents import Document
+
+load_dotenv()
+
+# "auto" keeps small indexes in memory, "redis" never does, "memory" always does
+VECTOR_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND", "auto")
+# Largest index "auto" loads into process memory (2000 x 384 float32 = 3 MiB)
+IN_MEMORY_INDEX_MAX_CHUNKS = int(os.getenv("IN_MEMORY_INDEX_MAX_CHUNKS", "2000"))
+
+
+class InMemoryVectorIndex:
+    """
+    Exact cosine KNN over a session index held in process memory
+
+    Vectors are L2-normalised rows of one contiguous float32 matrix, so a
+    query is a single matrix-vector product followed by argpartition for
+    the top k. Distances match RediSearch's COSINE metric (1 - similarity).
+    """
+
+    __slots__ = ("matrix", "documents")
+
+    def __init__(self, matrix: np.ndarray, documents: List[Document]):
+        self.matrix = matrix
+        self.documents = documents
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __sizeof__(self) -> int:
+        return (
+            object.__sizeof__(self)
+            + self.matrix.nbytes
+            + sum(sys.getsizeof(doc.page_content) for doc in self.documents)
+        )
+
+    @classmethod
+    def from_vectors(cls, vectors, documents: List[Document]) -> "InMemoryVectorIndex":
+        matrix = np.array(vectors, dtype=np.float32, order="C")
+        if matrix.size:
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.clip(norms, 1e-12, None)
+        return cls(matrix, documents)
+
+    @classmethod
+    def from_redis(
+        cls, rds: Redis, max_chunks: Optional[int] = None, batch_size: int = 500
+    ) -> Optional["InMemoryVectorIndex"]:
+        """
+        Load every document of a vectorstore's index
+
+        Documents are paged out of the index itself with FT.SEARCH, so the
+        cost follows the size of this index, not of the whole keyspace.
+
+        Returns:
+            The index, or None when it holds more than max_chunks documents
+        """
+        schema = rds._schema
+        metadata_keys = list(schema.metadata_keys)
+        fields = [schema.content_key, schema.content_vector_key, *metadata_keys]
+
+        def page(offset: int, count: int) -> list:
+            # Raw reply: the search Result helper would decode the vector bytes
+            return rds.client.execute_command(
+                "FT.SEARCH", rds.index_name, "*",
+                "RETURN", len(fields), *fields,
+                "LIMIT", offset, count,
+                "DIALECT", 2,
+            )
+
+        total = int(page(0, 0)[0])
+        if max_chunks is not None and total > max_chunks:
+            return None
+
+        vectors, documents = [], []
+        for offset in range(0, total, batch_size):
+            reply = page(offset, batch_size)
+            for key, values in zip(reply[1::2], reply[2::2]):
+                record = {
+                    _decode(name): value for name, value in zip(values[::2], values[1::2])
+                }
+                content = record.get(schema.content_key)
+                vector = record.get(schema.content_vector_key)
+                if content is None or vector is None:
+                    continue
+                vectors.append(np.frombuffer(vector, dtype=np.float32))
+                document_metadata = {"id": _decode(key)}
+                document_metadata.update(
+                    {name: _decode(record[name]) for name in metadata_keys if name in record}
+                )
+                documents.append(
+                    Document(page_content=_decode(content), metadata=document_metadata)
+                )
+
+        if not vectors:
+            return cls(np.empty((0, 0), dtype=np.float32), [])
+        return cls.from_vectors(np.vstack(vectors), documents)
+
+    def search(self, vector, k: int) -> List[Tuple[Document, float]]:
+        """(document, cosine distance) pairs of the k nearest rows, closest first"""
+        if not self.documents:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        scores = self.matrix @ query
+        k = min(k, len(scores))
+        if k < len(scores):
+            top = np.argpartition(scores, -k)[-k:]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(self.documents[row], float(1.0 - scores[row])) for row in top]
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
@@ -0,0 +1,138 @@
+import os
+import threading
+from typing import Dict, Tuple
+
+import redis
+import redis.asyncio
+from dotenv import load_dotenv
+from langchain_community.vectorstores.redis import Redis
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+# Seconds a caller waits for a free connection before failing
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+# Idle connections are PINGed before reuse once this many seconds have passed
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+_PoolKey = Tuple[str, bool]
+
+_pools: Dict[_PoolKey, redis.BlockingConnectionPool] = {}
+_async_pools: Dict[_PoolKey, redis.asyncio.BlockingConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_kwargs(decode_responses: bool) -> dict:
+    return {
+        "max_connections": REDIS_MAX_CONNECTIONS,
+        "timeout": REDIS_POOL_TIMEOUT,
+        "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+        "socket_keepalive": True,
+        "decode_responses": decode_responses,
+    }
+
+
+def get_connection_pool(
+    redis_url: str = REDIS_URL, decode_responses: bool = False
+) -> redis.BlockingConnectionPool:
+    """
+    Process-wide blocking pool for a Redis URL
+
+    Text (decode_responses=True) and binary clients need differently
+    configured connections, so each gets its own pool. Callers beyond the
+    connection limit wait for a free connection instead of opening more.
+    """
+    key = (redis_url, decode_responses)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = redis.BlockingConnectionPool.from_url(
+                    redis_url, **_pool_kwargs(decode_responses)
+                )
+                _pools[key] = pool
+    return pool
+
+
+def get_async_connection_pool(
+    redis_url: str = REDIS_URL, decode_responses: bool = False
+) -> redis.asyncio.BlockingConnectionPool:
+    """Asyncio counterpart of get_connection_pool, for use on the event loop"""
+    key = (redis_url, decode_responses)
+    pool = _async_pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _async_pools.get(key)
+            if pool is None:
+                pool = redis.asyncio.BlockingConnectionPool.from_url(
+                    redis_url, **_pool_kwargs(decode_responses)
+                )
+                _async_pools[key] = pool
+    return pool
+
+
+def get_redis_client(redis_url: str = REDIS_URL, decode_responses: bool = False) -> redis.Redis:
+    return redis.Redis(connection_pool=get_connection_pool(redis_url, decode_responses))
+
+
+def get_async_redis_client(
+    redis_url: str = REDIS_URL, decode_responses: bool = False
+) -> redis.asyncio.Redis:
+    return redis.asyncio.Redis(
+        connection_pool=get_async_connection_pool(redis_url, decode_responses)
+    )
+
+
+def use_shared_client(rds: Redis, redis_url: str = REDIS_URL) -> Redis:
+    """
+    Point a langchain Redis vectorstore at the shared binary pool
+
+    The vectorstore constructor opens its own client to check the RediSearch
+    module; that client is closed here so only pooled connections remain.
+    """
+    own_client = rds.client
+    rds.client = get_redis_client(redis_url)
+    if own_client is not rds.client:
+        own_client.connection_pool.disconnect()
+    return rds
+
+
+def _sync_pool_metrics(pool: redis.BlockingConnectionPool) -> dict:
+    created = len(pool._connections)
+    idle = sum(1 for connection in list(pool.pool.queue) if connection is not None)
+    return {
+        "max_connections": pool.max_connections,
+        "created": created,
+        "in_use": created - idle,
+        "idle": idle,
+        "utilisation": round((created - idle) / pool.max_connections, 4),
+    }
+
+
+def _async_pool_metrics(pool: redis.asyncio.BlockingConnectionPool) -> dict:
+    created = len(pool._connections)
+    idle = sum(1 for connection in list(pool.pool._queue) if connection is not None)
+    return {
+        "max_connections": pool.max_connections,
+        "created": created,
+        "in_use": created - idle,
+        "idle": idle,
+        "utilisation": round((created - idle) / pool.max_connections, 4),
+    }
+
+
+def get_pool_metrics() -> dict:
+    """Connection counts and utilisation of every pool in this process"""
+    def label(key: _PoolKey) -> str:
+        return "text" if key[1] else "binary"
+
+    return {
+        "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+        "pool_timeout": REDIS_POOL_TIMEOUT,
+        "sync": {label(key): _sync_pool_metrics(pool) for key, pool in list(_pools.items())},
+        "async": {
+            label(key): _async_pool_metrics(pool) for key, pool in list(_async_pools.items())
+        },
+    }
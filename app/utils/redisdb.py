@@ -1,4 +1,58 @@
-import redis
+import os
+from dotenv import load_dotenv
+from app.models.request import RetrievalMode
+from app.utils.redis_pool import get_async_redis_client, get_redis_client
+
+load_dotenv()
+
+SESSION_KEY_PREFIX = "session"
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(60 * 60)))
+
+TRANSACTIONS_INDEX = "transactions_index"
+FULL_TEXT_INDEX = "full_text_data"
+SESSION_INDEXES = (TRANSACTIONS_INDEX, FULL_TEXT_INDEX)
+
+# Sorted set of live session ids scored by last access, shared by every worker
+LIVE_SESSIONS_KEY = "sessions:live"
+
+
+def session_key_prefix(session_id: str) -> str:
+    """Prefix under which every key owned by a session lives"""
+    return f"{SESSION_KEY_PREFIX}:{session_id}"
+
+
+def session_meta_key(session_id: str) -> str:
+    return f"{session_key_prefix(session_id)}:meta"
+
+
+def session_job_key(session_id: str) -> str:
+    return f"{session_key_prefix(session_id)}:job"
+
+
+def session_transactions_key(session_id: str) -> str:
+    return f"{session_key_prefix(session_id)}:transactions"
+
+
+def session_qcache_key(session_id: str, mode: RetrievalMode, kind: str) -> str:
+    return f"{session_key_prefix(session_id)}:qcache:{mode.value}:{kind}"
+
+
+def session_owned_keys(session_id: str) -> list:
+    """Fixed keys of a session besides its index documents and job record"""
+    keys = [session_meta_key(session_id), session_transactions_key(session_id)]
+    for mode in RetrievalMode:
+        keys.append(session_qcache_key(session_id, mode, "vectors"))
+        keys.append(session_qcache_key(session_id, mode, "answers"))
+    return keys
+
+
+def session_index_name(index_name: str, session_id: str) -> str:
+    return f"{index_name}_{session_id}"
+
+
+def session_index_key_prefix(index_name: str, session_id: str) -> str:
+    return f"{session_key_prefix(session_id)}:{index_name}"
+
 
 class RedisDB:
     def __init__(self, redis_url: str = "redis://localhost:6379"):
@@ -9,8 +63,7 @@ class RedisDB:
     
     def _connect(self):
         try:
-            self.client = redis.from_url(self.redis_url, decode_responses=True)
-            print(f"Connected to Redis DB!")
+            self.client = get_redis_client(self.redis_url, decode_responses=True)
         except Exception as e:
             print(f"Failed to connect to Redis: {e}")
             raise
@@ -26,15 +79,78 @@ class RedisDB:
             print(f"Redis ping failed: {e}")
             return False
     
-    def flush_memory(self):
+    async def aping(self) -> bool:
+        """Ping over the shared asyncio pool without blocking the event loop"""
+        try:
+            client = get_async_redis_client(self.redis_url, decode_responses=True)
+            return bool(await client.ping())
+        except Exception as e:
+            print(f"Redis ping failed: {e}")
+            return False
+
+    def list_session_indexes(self, session_id: str) -> list:
+        indexes = self.client.execute_command("FT._LIST")
+        suffix = f"_{session_id}"
+        return [name for name in indexes if name.endswith(suffix)]
+
+    def drop_session(self, session_id: str, batch_size: int = 500) -> bool:
+        """
+        Drop only the indexes and keys owned by one session
+
+        Each index is asked for its document keys in batches (FT.SEARCH
+        NOCONTENT), which are unlinked so memory is reclaimed in the
+        background; the definitions are then dropped without DD. The
+        session's fixed keys are unlinked by name, so the keyspace of the
+        other sessions is never walked. The job record is kept so a failed
+        extraction stays reportable until it expires;
+        JobManager.delete_job removes it explicitly.
+        """
         try:
-            self.client.flushdb()
-            print("Redis memory flushed successfully!")
+            removed = 0
+            for index_name in self.list_session_indexes(session_id):
+                while True:
+                    # Unlinked documents leave the index, so page 0 is always next
+                    result = self.client.execute_command(
+                        "FT.SEARCH", index_name, "*", "NOCONTENT", "LIMIT", 0, batch_size
+                    )
+                    keys = result[1:]
+                    unlinked = self.client.unlink(*keys) if keys else 0
+                    removed += unlinked
+                    if not unlinked:
+                        break
+                self.client.ft(index_name).dropindex(delete_documents=False)
+
+            removed += self.client.unlink(*session_owned_keys(session_id))
+
+            print(f"Dropped session {session_id} ({removed} keys unlinked)")
             return True
         except Exception as e:
-            print(f"Failed to flush Redis memory: {e}")
+            print(f"Failed to drop session {session_id}: {e}")
             return False
-    
+
+    def drop_orphaned_sessions(self) -> int:
+        """
+        Drop session indexes whose session metadata has expired in Redis
+
+        Covers sessions that went idle on every worker, including ones no
+        worker currently holds in its local cache.
+        """
+        try:
+            orphans = set()
+            for index_name in self.client.execute_command("FT._LIST"):
+                base, _, session_id = index_name.rpartition("_")
+                if base not in SESSION_INDEXES:
+                    continue
+                if not self.client.exists(session_meta_key(session_id)):
+                    orphans.add(session_id)
+
+            for session_id in orphans:
+                self.drop_session(session_id)
+            return len(orphans)
+        except Exception as e:
+            print(f"Failed to drop orphaned sessions: {e}")
+            return 0
+
     def get_info(self) -> dict:
         try:
             info = self.client.info()
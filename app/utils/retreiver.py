@@ -1,12 +1,204 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
 from langchain_community.vectorstores.redis.base import Redis
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from redis.commands.search.query import Query
+from redis.exceptions import ResponseError
+from app.utils.memory_index import (
+    IN_MEMORY_INDEX_MAX_CHUNKS,
+    VECTOR_INDEX_BACKEND,
+    InMemoryVectorIndex,
+)
+from app.utils.redis_pool import use_shared_client
+import logging
+import os
+import re
+
+# Rank offset of reciprocal rank fusion; 60 is the value from the RRF paper
+RRF_K = int(os.getenv("RRF_K", "60"))
+# Each ranking fetches this many times k candidates before fusing
+HYBRID_CANDIDATE_MULTIPLIER = int(os.getenv("HYBRID_CANDIDATE_MULTIPLIER", "2"))
+MIN_TERM_LENGTH = 2
+
+_TERM_RE = re.compile(r"[a-z0-9]+")
+
+logger = logging.getLogger(__name__)
 
 
 class Retreiver:
-    def __init__(self, rds: Redis=None) -> None:
-        self.rds = rds       
+    def __init__(
+        self,
+        rds: Redis=None,
+        k: int = 4,
+        memory_index: Optional[InMemoryVectorIndex] = None,
+    ) -> None:
+        self.rds = rds
+        self.k = k
+        self.memory_index = memory_index
     
     def retreive_using_similarity(self):
         if self.rds is None:
             raise ValueError("Retreiver is not initialized")
-        retreiver = self.rds.as_retriever(search_type="similarity",search_kwargs={"k": 4})
+        retreiver = self.rds.as_retriever(search_type="similarity",search_kwargs={"k": self.k})
+        return retreiver
+
+    def search_by_vector(
+        self, vector, k: Optional[int] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        KNN search with an already computed query vector
+
+        Returns (document, distance) pairs, closest first. Small indexes
+        loaded into memory are searched without a Redis round trip. Stores
+        other than Redis do not expose distances, so their rank is used
+        instead.
+        """
+        if self.rds is None:
+            raise ValueError("Retreiver is not initialized")
+        k = k or self.k
+
+        if self.memory_index is not None:
+            return self.memory_index.search(vector, k)
+
+        if not isinstance(self.rds, Redis):
+            docs = self.rds.similarity_search_by_vector(list(map(float, vector)), k=k)
+            return [(doc, float(rank)) for rank, doc in enumerate(docs)]
+
+        schema = self.rds._schema
+        query = (
+            Query(f"*=>[KNN {k} @{schema.content_vector_key} $vector AS vector_distance]")
+            .return_fields(schema.content_key, "vector_distance", *schema.metadata_keys)
+            .sort_by("vector_distance")
+            .paging(0, k)
+            .dialect(2)
+        )
+        params = {"vector": np.asarray(vector, dtype=np.float32).tobytes()}
+        results = self.rds.client.ft(self.rds.index_name).search(query, params)
+        return [
+            (self._to_document(doc), float(doc.vector_distance)) for doc in results.docs
+        ]
+
+    def search_by_text(self, text: str, k: Optional[int] = None) -> List[Tuple[Document, float]]:
+        """
+        BM25 full-text search over the indexed chunk contents
+
+        Matches any of the query's terms, so exact tokens such as merchant
+        names, card digits and reference codes are found even when their
+        embedding is not close to the query's. Returns (document, score)
+        pairs, best first; stores other than Redis have no text index and
+        return nothing.
+        """
+        if self.rds is None:
+            raise ValueError("Retreiver is not initialized")
+        if not isinstance(self.rds, Redis):
+            return []
+        k = k or self.k
+
+        terms = list(dict.fromkeys(_TERM_RE.findall(text.lower())))
+        terms = [term for term in terms if len(term) >= MIN_TERM_LENGTH]
+        if not terms:
+            return []
+
+        schema = self.rds._schema
+        query = (
+            Query(f"@{schema.content_key}:({'|'.join(terms)})")
+            .scorer("BM25")
+            .with_scores()
+            .return_fields(schema.content_key, *schema.metadata_keys)
+            .paging(0, k)
+            .dialect(2)
+        )
+        try:
+            results = self.rds.client.ft(self.rds.index_name).search(query)
+        except ResponseError as e:
+            # e.g. a query made only of RediSearch stopwords
+            logger.warning(f"Full-text search failed: {e}")
+            return []
+        return [(self._to_document(doc), float(doc.score)) for doc in results.docs]
+
+    def hybrid_search(
+        self, text: str, vector, k: Optional[int] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Fuse vector and BM25 rankings with reciprocal rank fusion
+
+        Each list contributes 1 / (RRF_K + rank) per document. The fused
+        score is returned as a distance in [0, 1] (0 = ranked first by both)
+        so hybrid results sort the same way as vector distances.
+        """
+        k = k or self.k
+        candidates = k * HYBRID_CANDIDATE_MULTIPLIER
+        rankings = [
+            self.search_by_vector(vector, candidates),
+            self.search_by_text(text, candidates),
+        ]
+
+        scores, documents = {}, {}
+        for ranking in rankings:
+            for rank, (doc, _) in enumerate(ranking, start=1):
+                doc_id = doc.metadata.get("id", doc.page_content)
+                documents.setdefault(doc_id, doc)
+                scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (RRF_K + rank)
+
+        best_possible = len(rankings) / (RRF_K + 1)
+        fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(documents[doc_id], 1.0 - score / best_possible) for doc_id, score in fused]
+
+    def _to_document(self, doc) -> Document:
+        schema = self.rds._schema
+        metadata = {"id": doc.id}
+        metadata.update(
+            {key: getattr(doc, key) for key in schema.metadata_keys if hasattr(doc, key)}
+        )
+        return Document(page_content=getattr(doc, schema.content_key), metadata=metadata)
+
+    def load_memory_index(
+        self,
+        backend: str = VECTOR_INDEX_BACKEND,
+        max_chunks: int = IN_MEMORY_INDEX_MAX_CHUNKS,
+    ) -> bool:
+        """
+        Copy the index into process memory for vector search
+
+        Call once the index is complete. With the "auto" backend only
+        indexes of at most max_chunks documents are loaded.
+
+        Returns:
+            Whether vector searches are now served from memory
+        """
+        if backend == "redis" or not isinstance(self.rds, Redis):
+            return False
+        self.memory_index = InMemoryVectorIndex.from_redis(
+            self.rds, max_chunks if backend == "auto" else None
+        )
+        return self.memory_index is not None
+
+    def to_metadata(self) -> dict:
+        """Everything needed to rebuild this retreiver on another worker"""
+        if self.rds is None:
+            raise ValueError("Retreiver is not initialized")
+        return {
+            "index_name": self.rds.index_name,
+            "key_prefix": self.rds.key_prefix,
+            "schema": self.rds.schema,
+            "k": self.k,
+            "memory_index": self.memory_index is not None,
+        }
+
+    @classmethod
+    def from_metadata(
+        cls, metadata: dict, embedding: Embeddings, redis_url: str
+    ) -> "Retreiver":
+        rds = Redis.from_existing_index(
+            embedding,
+            index_name=metadata["index_name"],
+            schema=metadata["schema"],
+            key_prefix=metadata["key_prefix"],
+            redis_url=redis_url,
+        )
+        retreiver = cls(rds=use_shared_client(rds, redis_url), k=metadata["k"])
+        if metadata.get("memory_index"):
+            retreiver.load_memory_index()
         return retreiver
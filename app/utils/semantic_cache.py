@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.models.request import RetrievalMode
+from app.utils.decorators.singleton import singleton
+from app.utils.redis_pool import get_redis_client
+from app.utils.embedding_registry import EmbeddingRegistry
+from app.utils.redisdb import session_qcache_key
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", str(60 * 60)))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "50"))
+
+logger = logging.getLogger(__name__)
+
+
+def _vectors_key(session_id: str, mode: RetrievalMode) -> str:
+    return session_qcache_key(session_id, mode, "vectors")
+
+
+def _answers_key(session_id: str, mode: RetrievalMode) -> str:
+    return session_qcache_key(session_id, mode, "answers")
+
+
+@singleton
+class SemanticCache:
+    """
+    Per-session cache of answers to semantically similar prompts
+
+    Prompt vectors (normalised float32) and the SSE events of their answers
+    are kept in two Redis hashes under the session prefix, one pair per
+    retrieval mode. A new prompt whose cosine similarity to a prompt cached
+    for the same mode reaches the threshold replays that answer instead of
+    running retrieval and generation again.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = REDIS_URL,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds: int = SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+    ):
+        # Binary client: vectors are stored as raw float32 bytes
+        self.client = get_redis_client(redis_url)
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def embed_prompt(self, prompt: str) -> np.ndarray:
+        vector = np.asarray(
+            EmbeddingRegistry().get_embeddings().embed_query(prompt), dtype=np.float32
+        )
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(
+        self,
+        session_id: str,
+        vector: np.ndarray,
+        mode: RetrievalMode = RetrievalMode.VECTOR,
+    ) -> Optional[List[str]]:
+        """Return the cached SSE events of the closest prompt above threshold"""
+        try:
+            events = self._find(session_id, vector, mode)
+        except Exception as e:
+            # An unreachable cache or a corrupt entry only costs a cache miss
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            events = None
+
+        with self._lock:
+            if events is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return events
+
+    def _find(
+        self, session_id: str, vector: np.ndarray, mode: RetrievalMode
+    ) -> Optional[List[str]]:
+        entries = self.client.hgetall(_vectors_key(session_id, mode))
+        best_id, best_score = None, self.threshold
+        if entries:
+            entry_ids = list(entries)
+            matrix = np.frombuffer(b"".join(entries.values()), dtype=np.float32)
+            scores = matrix.reshape(len(entry_ids), -1) @ vector
+            index = int(np.argmax(scores))
+            if scores[index] >= best_score:
+                best_id, best_score = entry_ids[index], float(scores[index])
+
+        answer = (
+            self.client.hget(_answers_key(session_id, mode), best_id) if best_id else None
+        )
+        return json.loads(answer) if answer is not None else None
+
+    def store(
+        self,
+        session_id: str,
+        vector: np.ndarray,
+        events: List[str],
+        mode: RetrievalMode = RetrievalMode.VECTOR,
+    ):
+        vectors_key = _vectors_key(session_id, mode)
+        answers_key = _answers_key(session_id, mode)
+        entry_id = str(time.time_ns())
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            pipeline.hset(vectors_key, entry_id, vector.astype(np.float32).tobytes())
+            pipeline.hset(answers_key, entry_id, json.dumps(events))
+            pipeline.expire(vectors_key, self.ttl_seconds)
+            pipeline.expire(answers_key, self.ttl_seconds)
+            pipeline.hkeys(vectors_key)
+            entry_ids = pipeline.execute()[-1]
+
+            # Entry ids are timestamps, so the smallest ones are the oldest
+            excess = sorted(entry_ids, key=int)[:max(len(entry_ids) - self.max_entries, 0)]
+            if excess:
+                pipeline = self.client.pipeline(transaction=False)
+                pipeline.hdel(vectors_key, *excess)
+                pipeline.hdel(answers_key, *excess)
+                pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Semantic cache write failed: {e}")
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypassed += 1
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "threshold": self.threshold,
+                "ttl_seconds": self.ttl_seconds,
+            }
@@ -1,33 +1,301 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
+import json
+import os
+import sys
+import threading
+import time
 import uuid
 
+from dotenv import load_dotenv
+
+from app.utils.chains.query_chain import QueryChain
 from app.utils.decorators.singleton import singleton
+from app.utils.embedding_registry import EmbeddingRegistry
+from app.utils.job_manager import JobManager
+from app.utils.redisdb import (
+    LIVE_SESSIONS_KEY,
+    RedisDB,
+    SESSION_TTL_SECONDS,
+    session_job_key,
+    session_meta_key,
+)
 from app.utils.retreiver import Retreiver
 
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "100"))
+
+
+def _approx_size(obj, seen: set, depth: int = 4) -> int:
+    """Rough recursive sys.getsizeof that skips objects already counted"""
+    if id(obj) in seen or depth < 0:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        items = list(obj.items())
+        size += sum(
+            _approx_size(k, seen, depth - 1) + _approx_size(v, seen, depth - 1)
+            for k, v in items
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_approx_size(item, seen, depth - 1) for item in list(obj))
+    elif hasattr(obj, "__dict__"):
+        size += _approx_size(vars(obj), seen, depth - 1)
+    return size
+
 
 @singleton
 class SessionManager:
-    def __init__(self):
-        self.sessions = {}
+    """
+    Redis-backed session registry with a bounded local retreiver cache
+
+    Session metadata (index names, schemas, creation time, document hash)
+    lives in Redis under the session prefix, so any worker can serve any
+    session; retreivers are rebuilt lazily from it and cached locally.
+    The metadata expires after SESSION_TTL_SECONDS without access on any
+    worker, after which the session's indexes are swept from Redis.
 
-    def create_sesssion(self, session_id: str = None):
+    At most MAX_SESSIONS sessions are live across all workers: every
+    session is tracked in a Redis sorted set scored by last access, and
+    creating one past the cap evicts the least recently used sessions,
+    dropping their Redis indexes. The local cache is bounded the same way
+    and drops entries idle for longer than the TTL. Sessions still being
+    extracted are never evicted.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = SESSION_TTL_SECONDS,
+        max_sessions: int = MAX_SESSIONS,
+        redis_url: str = REDIS_URL,
+    ):
+        self.sessions = OrderedDict()
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.redis_url = redis_url
+        self.redis_db = RedisDB(redis_url=redis_url)
+        self.job_manager = JobManager(redis_url=redis_url)
+        self._last_access: Dict[str, float] = {}
+        self._query_chains: Dict[str, QueryChain] = {}
+        self._lock = threading.RLock()
+        self._sweep_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="session-sweep"
+        )
+        # ttl/lru: dropped from the local cache; capacity: dropped from Redis
+        self.evictions = {"ttl": 0, "lru": 0, "capacity": 0}
+        self.rebuilds = 0
+
+    def create_sesssion(self, session_id: str = None, document_hash: str = None):
         session_id = session_id or str(uuid.uuid4())
-        self.sessions[session_id] = {}
+        pipeline = self.redis_db.client.pipeline(transaction=False)
+        pipeline.hset(
+            session_meta_key(session_id),
+            mapping={
+                "created_at": time.time(),
+                "document_hash": document_hash or "",
+            },
+        )
+        pipeline.expire(session_meta_key(session_id), self.ttl_seconds)
+        pipeline.zadd(LIVE_SESSIONS_KEY, {session_id: time.time()})
+        pipeline.execute()
+        self._evict_over_capacity()
         return session_id
 
     def get_session_retreivers_by_id(self, session_id: str):
-        return self.sessions[session_id]
+        with self._lock:
+            retreivers = self.sessions.get(session_id)
+            if retreivers is not None:
+                self._touch_local(session_id)
+
+        if retreivers is None:
+            retreivers = self._rebuild_retreivers(session_id)
+
+        self._refresh_ttl(session_id)
+        return retreivers
+
+    def get_query_chain(self, session_id: str) -> QueryChain:
+        """Return the session's assembled QueryChain, building it on first use"""
+        retreivers = self.get_session_retreivers_by_id(session_id)
+        with self._lock:
+            query_chain = self._query_chains.get(session_id)
+            if query_chain is None:
+                query_chain = QueryChain(
+                    transactions_retriever=retreivers["transactions_retreiver"],
+                    full_text_retriever=retreivers["full_text_retreiver"],
+                )
+                self._query_chains[session_id] = query_chain
+        return query_chain
+
+    def get_session_metadata(self, session_id: str) -> dict:
+        meta = self.redis_db.client.hgetall(session_meta_key(session_id))
+        if "retreivers" in meta:
+            meta["retreivers"] = json.loads(meta["retreivers"])
+        return meta
 
     def get_all_sessions(self):
-        return self.sessions.items()
+        with self._lock:
+            return list(self.sessions.items())
 
     def session_exists(self, session_id: str):
-        return session_id in self.sessions
+        if self.redis_db.client.exists(session_meta_key(session_id)):
+            return True
+        # Expired on every worker; forget any local copy
+        self._drop_local(session_id)
+        return False
 
     def add_retreivers_to_session(
         self, session_id: str, retreivers: Dict[str, Retreiver]
     ):
-        self.sessions[session_id] = retreivers
+        metadata = {name: r.to_metadata() for name, r in retreivers.items()}
+        pipeline = self.redis_db.client.pipeline(transaction=False)
+        pipeline.hset(session_meta_key(session_id), "retreivers", json.dumps(metadata))
+        pipeline.expire(session_meta_key(session_id), self.ttl_seconds)
+        pipeline.zadd(LIVE_SESSIONS_KEY, {session_id: time.time()}, xx=True)
+        pipeline.execute()
+        self._cache_local(session_id, retreivers)
 
     def delete_session_by_id(self, session_id: str):
-        del self.sessions[session_id]
+        self._drop_local(session_id)
+        pipeline = self.redis_db.client.pipeline(transaction=False)
+        pipeline.delete(session_meta_key(session_id))
+        pipeline.zrem(LIVE_SESSIONS_KEY, session_id)
+        pipeline.execute()
+
+    def evict_expired(self) -> int:
+        """
+        Drop locally cached sessions idle for longer than the TTL and sweep
+        the indexes of sessions that have expired on every worker
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                sid
+                for sid, last_access in self._last_access.items()
+                if now - last_access > self.ttl_seconds
+            ]
+            for session_id in expired:
+                self._drop_local(session_id)
+                self.evictions["ttl"] += 1
+        self._sweep_executor.submit(self.redis_db.drop_orphaned_sessions)
+        return len(expired)
+
+    def get_stats(self) -> dict:
+        now = time.monotonic()
+        shared = {id(m) for m in EmbeddingRegistry().loaded_models()}
+        with self._lock:
+            sessions = [
+                {
+                    "session_id": session_id,
+                    "idle_seconds": round(now - self._last_access[session_id], 1),
+                    "approx_bytes": _approx_size(retreivers, set(shared)),
+                }
+                for session_id, retreivers in self.sessions.items()
+            ]
+            evictions = dict(self.evictions)
+            rebuilds = self.rebuilds
+
+        total_bytes = sum(s["approx_bytes"] for s in sessions)
+        return {
+            # Sessions on every worker; the rest of the figures are this worker's
+            "live_sessions": self.redis_db.client.zcard(LIVE_SESSIONS_KEY),
+            "locally_cached_sessions": len(sessions),
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl_seconds,
+            "approx_bytes_total": total_bytes,
+            "approx_bytes_per_session": (
+                total_bytes // len(sessions) if sessions else 0
+            ),
+            "evictions": evictions,
+            "rebuilds_from_redis": rebuilds,
+            "sessions": sessions,
+        }
+
+    def _rebuild_retreivers(self, session_id: str) -> Dict[str, Retreiver]:
+        """Rebuild a session's retreivers from its Redis metadata"""
+        meta = self.get_session_metadata(session_id)
+        if "retreivers" not in meta:
+            raise KeyError(f"Session {session_id} has no indexes")
+
+        embedding = EmbeddingRegistry().get_embeddings()
+        retreivers = {
+            name: Retreiver.from_metadata(metadata, embedding, self.redis_url)
+            for name, metadata in meta["retreivers"].items()
+        }
+        with self._lock:
+            self.rebuilds += 1
+        self._cache_local(session_id, retreivers)
+        return retreivers
+
+    def _refresh_ttl(self, session_id: str):
+        pipeline = self.redis_db.client.pipeline(transaction=False)
+        pipeline.expire(session_meta_key(session_id), self.ttl_seconds)
+        pipeline.expire(session_job_key(session_id), self.ttl_seconds)
+        pipeline.zadd(LIVE_SESSIONS_KEY, {session_id: time.time()}, xx=True)
+        pipeline.execute()
+
+    def _evict_over_capacity(self) -> int:
+        """
+        Evict the least recently used sessions while more than max_sessions
+        are live on all workers, dropping their Redis indexes
+        """
+        pipeline = self.redis_db.client.pipeline(transaction=False)
+        # Members not accessed within the TTL have expired metadata already
+        pipeline.zremrangebyscore(
+            LIVE_SESSIONS_KEY, "-inf", time.time() - self.ttl_seconds
+        )
+        pipeline.zcard(LIVE_SESSIONS_KEY)
+        _, live = pipeline.execute()
+
+        excess = live - self.max_sessions
+        if excess <= 0:
+            return 0
+
+        evicted = 0
+        # Oldest first; sessions still being extracted are never evicted
+        for session_id in self.redis_db.client.zrange(LIVE_SESSIONS_KEY, 0, -1):
+            if evicted >= excess:
+                break
+            if self.job_manager.is_in_progress(session_id):
+                continue
+            # Whichever worker removes the member owns the eviction
+            if not self.redis_db.client.zrem(LIVE_SESSIONS_KEY, session_id):
+                continue
+            self.delete_session_by_id(session_id)
+            self.job_manager.delete_job(session_id)
+            self._sweep_executor.submit(self.redis_db.drop_session, session_id)
+            evicted += 1
+
+        with self._lock:
+            self.evictions["capacity"] += evicted
+        return evicted
+
+    def _cache_local(self, session_id: str, retreivers: Dict[str, Retreiver]):
+        with self._lock:
+            self.sessions[session_id] = retreivers
+            self._touch_local(session_id)
+            excess = len(self.sessions) - self.max_sessions
+            if excess <= 0:
+                return
+            # Oldest first; sessions extracting on this worker stay cached
+            running = set(self.job_manager.jobs)
+            candidates = [sid for sid in self.sessions if sid not in running]
+            for oldest in candidates[:excess]:
+                self._drop_local(oldest)
+                self.evictions["lru"] += 1
+
+    def _touch_local(self, session_id: str):
+        self._last_access[session_id] = time.monotonic()
+        self.sessions.move_to_end(session_id)
+
+    def _drop_local(self, session_id: str):
+        with self._lock:
+            self.sessions.pop(session_id, None)
+            self._last_access.pop(session_id, None)
+            self._query_chains.pop(session_id, None)
@@ -0,0 +1,104 @@
+from typing import Iterator, List, Optional, Sequence, Tuple
+import csv
+import io
+
+
+class ExtractedTable:
+    """
+    Lightweight table extracted from a statement page
+
+    Rows are stored as tuples of cell strings (or None). The text and CSV
+    renderings are only built when first requested and then cached.
+    """
+
+    __slots__ = ("columns", "rows", "_text", "_csv")
+
+    def __init__(self, columns: Sequence[str], rows: List[Tuple[Optional[str], ...]]):
+        self.columns = list(columns)
+        self.rows = rows
+        self._text = None
+        self._csv = None
+
+    @classmethod
+    def from_raw(cls, table: List[list]) -> "ExtractedTable":
+        """
+        Build a cleaned table from raw extractor output (header row first)
+
+        Drops all-None rows and columns, rows whose cells are all blank and a
+        repeated header row, and strips column names.
+        """
+        header, data = table[0], table[1:]
+        width = len(header)
+        rows = [
+            tuple(row[:width]) + (None,) * (width - len(row))
+            for row in data
+            if any(cell is not None for cell in row)
+        ]
+
+        keep = [i for i in range(width) if any(row[i] is not None for row in rows)]
+        if len(keep) != width:
+            header = [header[i] for i in keep]
+            rows = [tuple(row[i] for i in keep) for row in rows]
+
+        # Remove rows where all values are empty strings
+        rows = [row for row in rows if any(str(cell).strip() for cell in row)]
+
+        columns = [str(col).strip() for col in header]
+
+        # Remove duplicate headers that might appear in data
+        if len(rows) > 1:
+            column_names = [col.lower() for col in columns]
+            if [str(cell).lower() for cell in rows[0]] == column_names:
+                rows = rows[1:]
+
+        return cls(columns, rows)
+
+    def to_dict(self) -> dict:
+        return {"columns": self.columns, "rows": [list(row) for row in self.rows]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExtractedTable":
+        return cls(data["columns"], [tuple(row) for row in data["rows"]])
+
+    @property
+    def empty(self) -> bool:
+        return not self.rows or not self.columns
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.rows), len(self.columns)
+
+    def column(self, name: str) -> List[Optional[str]]:
+        index = self.columns.index(name)
+        return [row[index] for row in self.rows]
+
+    def records(self) -> Iterator[dict]:
+        for row in self.rows:
+            yield dict(zip(self.columns, row))
+
+    @property
+    def text(self) -> str:
+        """Right-aligned plain text rendering, one line per row"""
+        if self._text is None:
+            cells = [self.columns] + [
+                ["" if cell is None else str(cell) for cell in row]
+                for row in self.rows
+            ]
+            widths = [max(len(line[i]) for line in cells) for i in range(len(self.columns))]
+            self._text = "\n".join(
+                " ".join(cell.rjust(width) for cell, width in zip(line, widths))
+                for line in cells
+            )
+        return self._text
+
+    @property
+    def csv(self) -> str:
+        if self._csv is None:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow(self.columns)
+            writer.writerows(
+                ["" if cell is None else cell for cell in row] for row in self.rows
+            )
+            self._csv = buffer.getvalue()
+        return self._csv
@@ -1,43 +1,71 @@
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from langchain.tools import BaseTool
+import io
+import math
+import os
 import pdfplumber
-import pandas as pd
-import re
+from app.utils.tools.extracted_table import ExtractedTable
+from app.utils.tools.transaction_line_parser import (
+    LineKind,
+    TransactionLineParser,
+    extract_merchant,
+)
 
+TABLE_TYPES = ("transactions", "account_summary", "fees_table", "raw_tables")
 
-class TableExtractionTool(BaseTool):
-    name: str = "table-extractor"
-    description: str = "Extract structured tables from PDF documents"
+# Page ranges long statements are split into for the parser processes; 1 keeps
+# extraction serial
+TABLE_EXTRACTION_WORKERS = int(
+    os.getenv("TABLE_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+# Statements shorter than this are parsed serially in the calling process
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("PARALLEL_PAGE_THRESHOLD", "20"))
 
-    def _run(self, pdf_path: str) -> dict:
-        tables = {
-            "transactions": [],
-            "account_summary": [],
-            "fees_table": [],
-            "raw_tables": [],
-        }
+_line_parser = TransactionLineParser()
 
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                total_tables = 0
+# A path on disk or the document itself, already in memory
+PdfSource = Union[str, bytes]
 
-                for page_num, page in enumerate(pdf.pages):
+def open_pdf(source: PdfSource):
+    """Open a PDF from a path or from an in-memory buffer without touching disk"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return pdfplumber.open(io.BytesIO(source))
+    return pdfplumber.open(source)
 
-                    page_tables = page.extract_tables()
 
-                    text_tables = self._extract_structured_text(page)
+def count_pages(source: PdfSource) -> int:
+    with open_pdf(source) as pdf:
+        return len(pdf.pages)
 
-                    all_page_tables = page_tables + text_tables
-                    total_tables += len(all_page_tables)
 
-                    for i, table in enumerate(all_page_tables):
-                        if table and len(table) > 1:  # Has headers + data
-                            df = pd.DataFrame(table[1:], columns=table[0])
-                            df = self._clean_dataframe(df)
+def page_shards(
+    total_pages: int, workers: int = TABLE_EXTRACTION_WORKERS
+) -> List[Tuple[int, int]]:
+    """
+    Contiguous [start, end) page ranges to parse in parallel, in page order
 
-                            if not df.empty:
-                                table_type = self._classify_tables(df)
-                                tables[table_type].append(df)
+    Statements shorter than PARALLEL_PAGE_THRESHOLD stay a single range.
+    """
+    if workers <= 1 or total_pages < PARALLEL_PAGE_THRESHOLD:
+        return [(0, total_pages)]
+    shard_size = math.ceil(total_pages / workers)
+    return [
+        (start, min(start + shard_size, total_pages))
+        for start in range(0, total_pages, shard_size)
+    ]
+
+
+class TableExtractionTool(BaseTool):
+    name: str = "table-extractor"
+    description: str = "Extract structured tables from PDF documents"
+
+    def _run(self, pdf_path: PdfSource) -> Dict[str, List[ExtractedTable]]:
+        tables = {table_type: [] for table_type in TABLE_TYPES}
+
+        try:
+            for page_result in self.iter_pages(pdf_path):
+                for table_type, table in page_result["tables"]:
+                    tables[table_type].append(table)
 
         except Exception as e:
             print(f"pdfplumber extraction failed: {e}")
@@ -45,13 +73,62 @@ class TableExtractionTool(BaseTool):
 
             traceback.print_exc()
 
-        formatted_tables = self._format_tables(tables)
-        return formatted_tables
+        return tables
+
+    def iter_pages(
+        self, source: PdfSource, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[dict]:
+        """
+        Yield the extraction of each page in [start, end) as soon as it is parsed
 
+        Pages are parsed serially and released after use, so memory does not
+        grow with the length of the statement.
+        """
+        with open_pdf(source) as pdf:
+            for page in pdf.pages[start:end]:
+                yield self.extract_page(page)
 
-    def _extract_structured_text(self, page):
+    def extract_page(self, page) -> dict:
+        """Extract the text and classified tables of a single page"""
+        text = page.extract_text() or ""
+        try:
+            tables = self.extract_page_tables(page, text)
+        except Exception as e:
+            print(f"Table extraction failed on page {page.page_number}: {e}")
+            tables = []
+        page.flush_cache()
+
+        return {"page_number": page.page_number, "text": text, "tables": tables}
+
+    def extract_page_tables(self, page, text=None):
+        """
+        Extract and classify every table on a single page
+
+        Args:
+            page: pdfplumber page
+            text: Already extracted page text, to avoid extracting it twice
+
+        Returns:
+            List of (table_type, ExtractedTable) tuples in page order
+        """
+        if text is None:
+            text = page.extract_text()
+
+        page_tables = page.extract_tables()
+        text_tables = self._extract_structured_text(text)
+
+        classified = []
+        for raw_table in page_tables + text_tables:
+            if raw_table and len(raw_table) > 1:  # Has headers + data
+                table = ExtractedTable.from_raw(raw_table)
+
+                if not table.empty:
+                    classified.append((self._classify_tables(table), table))
+        return classified
+
+
+    def _extract_structured_text(self, text):
         """Enhanced extraction specifically for credit card statements"""
-        text = page.extract_text()
         if not text:
             return []
 
@@ -75,40 +152,31 @@ class TableExtractionTool(BaseTool):
         current_section = []
         in_transaction_section = False
 
-        transaction_headers = [
-            "YOUR TRANSACTIONS",
-            "Purchases, EMIs & Other Debits",
-            "Payments & Other Credits",
-            "Transaction Details",
-        ]
-
         for line in lines:
-            line = line.strip()
+            kind, parsed = _line_parser.classify(line.strip())
 
             # Check if we're entering a transaction section
-            if any(header in line for header in transaction_headers):
+            if kind is LineKind.SECTION_HEADER:
                 if current_section:  # Save previous section
                     sections.append(current_section)
                 current_section = []
                 in_transaction_section = True
                 continue
 
+            if not in_transaction_section:
+                continue
+
             # Check if we're leaving transaction section
-            if in_transaction_section and (
-                line.startswith("Card Number:")
-                or line.startswith("ACTIVE EMI")
-                or line.startswith("SPECIAL BENEFITS")
-                or len(line) == 0
-            ):
+            if kind is LineKind.SECTION_TERMINATOR:
                 if len(current_section) > 5:  # Only save if it has enough data
                     sections.append(current_section)
                 current_section = []
                 in_transaction_section = False
                 continue
 
-            # Collect lines in transaction sections
-            if in_transaction_section and self._looks_like_transaction_row(line):
-                current_section.append(line)
+            # Collect rows (parsed or not) in transaction sections
+            if kind is LineKind.TRANSACTION_ROW:
+                current_section.append(parsed)
 
         # Don't forget the last section
         if current_section and len(current_section) > 5:
@@ -117,20 +185,18 @@ class TableExtractionTool(BaseTool):
         return sections
 
 
-    def _parse_transaction_section(self, section_lines):
-        """Parse a transaction section into table format with simple narratives"""
-        if not section_lines:
+    def _parse_transaction_section(self, section_rows):
+        """Turn a section of parsed rows into table format with simple narratives"""
+        if not section_rows:
             return None
 
         headers = ["Date", "Description", "Amount", "Type", "Narrative"]
         table_data = [headers]
 
-        for line in section_lines:
-            row = self._parse_credit_card_transaction(line)
+        for row in section_rows:
             if row:
                 narrative = self._create_simple_narrative(row)
-                row.append(narrative)
-                table_data.append(row)
+                table_data.append([*row, narrative])
 
         return table_data if len(table_data) > 1 else None
 
@@ -138,91 +204,15 @@ class TableExtractionTool(BaseTool):
         """Convert transaction data to simple natural language"""
         date, description, amount, txn_type = transaction_row
         
-        merchant = description.split(',')[0].strip()
+        merchant = extract_merchant(description)
         
         if txn_type == "DR":  # Debit else Credit
             return f"On {date}, spent ₹{amount} at {merchant}"
         else:  
             return f"On {date}, received ₹{amount} from {merchant}"
 
-    def _parse_credit_card_transaction(self, line):
-        """Parse individual credit card transaction line"""
-        # Pattern for date at start: "21 Aug 25" or "21/Aug/2025"
-        date_match = re.match(
-            r"^(\d{1,2}\s+(Aug|Sep|Oct|Nov|Dec|Jan|Feb|Mar|Apr|May|Jun|Jul)\s+\d{2,4})",
-            line,
-        )
-
-        if not date_match:
-            return None
-
-        date = date_match.group(1)
-        remaining = line[len(date):].strip()
-
-        # Look for amount at the end (format: "1,234.56 DR" or "1,234.56 CR")
-        amount_match = re.search(r"([\d,]+\.?\d*)\s+(DR|CR)\s*$", remaining)
-
-        if amount_match:
-            amount = amount_match.group(1)
-            txn_type = amount_match.group(2)
-            description = remaining[:amount_match.start()].strip()
-
-            return [date, description, amount, txn_type]
-
-        return None
-
-
-    def _looks_like_transaction_row(self, line):
-        """Enhanced transaction row detection for credit cards"""
-        if not line or len(line.strip()) < 10:
-            return False
-
-        # Credit card specific patterns
-        patterns = [
-            r"^\d{1,2}\s+(Aug|Sep|Oct|Nov|Dec|Jan|Feb|Mar|Apr|May|Jun|Jul)\s+\d{2}",  # Date format
-            r"(DR|CR)\s*$",  # Ends with DR or CR
-        ]
-
-        return any(re.search(pattern, line) for pattern in patterns)
-
-    def _clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Clean and normalize the dataframe"""
-
-        df = df.dropna(how="all").dropna(axis=1, how="all")
-
-        # Remove rows where all values are empty strings
-        df = df[~df.apply(lambda x: x.astype(str).str.strip().eq("").all(), axis=1)]
-
-        # Clean column names
-        df.columns = [str(col).strip() for col in df.columns]
-
-        # Remove duplicate headers that might appear in data
-        if len(df) > 1:
-            header_row = df.iloc[0].astype(str).str.lower()
-            column_names = [str(col).lower() for col in df.columns]
-
-            if header_row.tolist() == column_names:
-                df = df.iloc[1:]  # Remove duplicate header row
-
-        return df
-
-    def _format_tables(self, tables_data: Dict[str, List[pd.DataFrame]]):
-        formatted_tables = {}
-        for table_type, dfs in tables_data.items():
-            formatted_tables[table_type] = []
-            for df in dfs:
-                # Convert DataFrame to JSON-serializable format
-                formatted_tables[table_type].append({
-                    "dataFrame": df,
-                    "text": df.to_string(index=False),
-                    "csv": df.to_csv(index=False),
-                    "shape": df.shape,
-                    "columns": df.columns.tolist()
-                })
-        return formatted_tables
-
-    def _classify_tables(self, df: pd.DataFrame) -> str:
-        headers = [str(col).lower() for col in df.columns]
+    def _classify_tables(self, table: ExtractedTable) -> str:
+        headers = [col.lower() for col in table.columns]
         header_text = " ".join(headers)
 
         transaction_keywords = [
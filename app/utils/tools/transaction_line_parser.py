@@ -0,0 +1,109 @@
+from enum import Enum
+from typing import NamedTuple, Optional, Tuple
+import re
+
+MONTHS = "Aug|Sep|Oct|Nov|Dec|Jan|Feb|Mar|Apr|May|Jun|Jul"
+
+TRANSACTION_HEADERS = (
+    "YOUR TRANSACTIONS",
+    "Purchases, EMIs & Other Debits",
+    "Payments & Other Credits",
+    "Transaction Details",
+)
+
+SECTION_TERMINATORS = ("Card Number:", "ACTIVE EMI", "SPECIAL BENEFITS")
+
+MIN_ROW_LENGTH = 10
+
+_HEADER_RE = re.compile("|".join(re.escape(header) for header in TRANSACTION_HEADERS))
+
+_DATE_RE = re.compile(rf"\d{{1,2}}\s+(?:{MONTHS})\s+\d{{2,4}}")
+# Amount at the end of the token preceding DR/CR: "1,234.56" in "... 1,234.56 DR"
+_AMOUNT_RE = re.compile(r"[\d,]+\.?\d*\Z")
+_TRANSACTION_TYPES = frozenset(("DR", "CR"))
+
+# Lines that look like rows but do not parse (wrapped descriptions, etc.)
+_ROW_HINT_RE = re.compile(rf"^\d{{1,2}}\s+(?:{MONTHS})\s+\d{{2}}|(?:DR|CR)\s*$")
+
+
+def extract_merchant(description: str) -> str:
+    """Merchant name is the part of the description before the first comma"""
+    return description.split(',')[0].strip()
+
+
+class LineKind(str, Enum):
+    SECTION_HEADER = "section_header"
+    SECTION_TERMINATOR = "section_terminator"
+    TRANSACTION_ROW = "transaction_row"
+    OTHER = "other"
+
+
+class ParsedTransaction(NamedTuple):
+    date: str
+    description: str
+    amount: str
+    txn_type: str
+
+
+class TransactionLineParser:
+    """
+    Classifies statement lines with precompiled patterns in a single pass
+
+    Each line is matched at most once per pattern, and transaction rows come
+    back with their date/description/amount/type groups already parsed.
+    The amount is located by splitting off the trailing DR/CR token instead
+    of scanning the whole line for it.
+    """
+
+    def classify(self, line: str) -> Tuple[LineKind, Optional[ParsedTransaction]]:
+        """
+        Classify a stripped statement line
+
+        Returns:
+            (kind, parsed) where parsed is only set for transaction rows
+            whose date, amount and DR/CR type could all be read
+        """
+        if not line:
+            return LineKind.SECTION_TERMINATOR, None
+
+        if _HEADER_RE.search(line):
+            return LineKind.SECTION_HEADER, None
+
+        if line.startswith(SECTION_TERMINATORS):
+            return LineKind.SECTION_TERMINATOR, None
+
+        if len(line) < MIN_ROW_LENGTH:
+            return LineKind.OTHER, None
+
+        parsed = self._parse_transaction(line)
+        if parsed is not None:
+            return LineKind.TRANSACTION_ROW, parsed
+
+        if _ROW_HINT_RE.search(line):
+            return LineKind.TRANSACTION_ROW, None
+
+        return LineKind.OTHER, None
+
+    def _parse_transaction(self, line: str) -> Optional[ParsedTransaction]:
+        """Parse "21 Aug 25 AMAZON PAY, BANGALORE 1,234.56 DR" style rows"""
+        date_match = _DATE_RE.match(line)
+        if date_match is None:
+            return None
+
+        parts = line[date_match.end():].rsplit(None, 1)
+        if len(parts) != 2 or parts[1] not in _TRANSACTION_TYPES:
+            return None
+
+        body, txn_type = parts
+        token = body.rsplit(None, 1)[-1]
+        amount_match = _AMOUNT_RE.search(token)
+        if amount_match is None:
+            return None
+
+        amount_start = len(body) - len(token) + amount_match.start()
+        return ParsedTransaction(
+            date_match.group(),
+            body[:amount_start].strip(),
+            body[amount_start:],
+            txn_type,
+        )
@@ -0,0 +1,427 @@
+import json
+import os
+import re
+from datetime import datetime
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from app.utils.decorators.singleton import singleton
+from app.utils.redis_pool import get_redis_client
+from app.utils.redisdb import SESSION_TTL_SECONDS, session_transactions_key
+from app.utils.tools.extracted_table import ExtractedTable
+from app.utils.tools.transaction_line_parser import extract_merchant
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+TOP_MERCHANTS_DEFAULT = 5
+
+_MONTH_NAMES = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9, "oct": 10,
+    "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+_DATE_FORMATS = ("%d %b %y", "%d %b %Y", "%d %B %y", "%d %B %Y")
+
+_QUESTION_DATE_RE = re.compile(
+    r"\b\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{2,4}\b"
+)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+# Month names that are also everyday words ("may I", "march")
+_AMBIGUOUS_MONTHS = frozenset(("may", "march"))
+# ...count as months only next to a date cue: "in May", "May 2025"
+_MONTH_CONTEXT_RE = re.compile(
+    r"\b(?:in|of|during|for|from|since|until|till|through|to|and|last|this)\s+"
+    r"(may|march)\b|\b(may|march)\s+\d{2,4}\b"
+)
+_TOP_N_RE = re.compile(r"\btop\s+(\d+)\b")
+
+_SUM_RE = re.compile(r"\b(total|sum|how much|overall)\b")
+_COUNT_RE = re.compile(r"\b(how many|number of|count)\b")
+_MAX_RE = re.compile(r"\b(largest|biggest|highest|maximum|max|most expensive)\b")
+_MIN_RE = re.compile(r"\b(smallest|lowest|minimum|min|cheapest)\b")
+_AVG_RE = re.compile(r"\b(average|avg|mean)\b")
+_TOP_RE = re.compile(r"\b(top|most(?! expensive)|where did i spend)\b")
+_DEBIT_RE = re.compile(r"\b(spent|spend|spending|debits?|purchases?|paid|charges?|emis?)\b")
+_CREDIT_RE = re.compile(r"\b(received|credits?|refunds?|cashback|reversals?)\b")
+# Aggregate words only count when the question is about transactions
+_TRANSACTION_CUE_RE = re.compile(
+    r"\b(transactions?|spent|spend|spending|debits?|credits?|purchases?|paid|"
+    r"charges?|emis?|received|refunds?|cashback|reversals?|merchants?)\b"
+)
+# Statement summary fields such as "total amount due" or "minimum due"
+_DUE_RE = re.compile(r"\b(amount|minimum|total|payment|balance)\s+(amount\s+)?due\b")
+
+# Words that describe the aggregate rather than which transactions to include
+_NON_KEYWORDS = frozenset(
+    """
+    a all am amount amounts and any are at by charge charges credit credits date
+    dates day debit debits did do does for from how i in is it last largest made
+    many me merchant merchants month most much my number of on or paid per
+    purchase purchases spend spending spent statement sum the this top total
+    transaction transactions was were what when where which with year you
+    biggest highest lowest smallest average mean count overall received
+    maximum minimum expensive cheapest between to show list give tell
+    make have had been be can get got there that these those so far please
+    pay paying payment payments receive buy bought cost costs expense expenses
+    """.split()
+) | frozenset(_MONTH_NAMES)
+
+
+def _parse_date(text: str) -> Optional[np.datetime64]:
+    for date_format in _DATE_FORMATS:
+        try:
+            return np.datetime64(datetime.strptime(text.strip(), date_format).date(), "D")
+        except ValueError:
+            continue
+    return None
+
+
+def _format_amount(amount: float) -> str:
+    return f"₹{amount:,.2f}"
+
+
+class TransactionTable:
+    """
+    Columnar, typed view of every parsed transaction row of a statement
+
+    Dates are datetime64[D], amounts float64 and merchants dictionary
+    encoded, so every aggregate is a boolean mask plus a numpy reduction.
+    """
+
+    __slots__ = ("dates", "amounts", "is_debit", "merchant_codes", "merchants", "descriptions")
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        amounts: np.ndarray,
+        is_debit: np.ndarray,
+        merchant_codes: np.ndarray,
+        merchants: List[str],
+        descriptions: List[str],
+    ):
+        self.dates = dates
+        self.amounts = amounts
+        self.is_debit = is_debit
+        self.merchant_codes = merchant_codes
+        self.merchants = merchants
+        self.descriptions = descriptions
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, str, str]]) -> "TransactionTable":
+        """Build from (date, description, amount, DR/CR) rows, skipping unreadable ones"""
+        dates, amounts, is_debit, merchant_codes, descriptions = [], [], [], [], []
+        merchant_index = {}
+        for date, description, amount, txn_type in rows:
+            parsed_date = _parse_date(date or "")
+            try:
+                parsed_amount = float((amount or "").replace(",", ""))
+            except ValueError:
+                continue
+            if parsed_date is None:
+                continue
+
+            merchant = extract_merchant(description or "")
+            dates.append(parsed_date)
+            amounts.append(parsed_amount)
+            is_debit.append(txn_type == "DR")
+            merchant_codes.append(merchant_index.setdefault(merchant, len(merchant_index)))
+            descriptions.append(description or "")
+
+        return cls(
+            np.array(dates, dtype="datetime64[D]"),
+            np.array(amounts, dtype=np.float64),
+            np.array(is_debit, dtype=bool),
+            np.array(merchant_codes, dtype=np.int32),
+            list(merchant_index),
+            descriptions,
+        )
+
+    @classmethod
+    def from_tables(cls, tables: Iterable[ExtractedTable]) -> "TransactionTable":
+        """Build from the parsed transaction tables of an extraction"""
+        rows = []
+        for table in tables:
+            if not {"Date", "Description", "Amount", "Type"} <= set(table.columns):
+                continue
+            rows.extend(
+                (record["Date"], record["Description"], record["Amount"], record["Type"])
+                for record in table.records()
+            )
+        return cls.from_rows(rows)
+
+    def to_mapping(self) -> dict:
+        return {
+            "dates": self.dates.astype(np.int64).tobytes(),
+            "amounts": self.amounts.tobytes(),
+            "is_debit": self.is_debit.astype(np.uint8).tobytes(),
+            "merchant_codes": self.merchant_codes.tobytes(),
+            "merchants": json.dumps(self.merchants),
+            "descriptions": json.dumps(self.descriptions),
+        }
+
+    @classmethod
+    def from_mapping(cls, mapping: dict) -> "TransactionTable":
+        return cls(
+            np.frombuffer(mapping[b"dates"], dtype=np.int64).astype("datetime64[D]"),
+            np.frombuffer(mapping[b"amounts"], dtype=np.float64),
+            np.frombuffer(mapping[b"is_debit"], dtype=np.uint8).astype(bool),
+            np.frombuffer(mapping[b"merchant_codes"], dtype=np.int32),
+            json.loads(mapping[b"merchants"]),
+            json.loads(mapping[b"descriptions"]),
+        )
+
+    def select(
+        self,
+        txn_type: Optional[str] = None,
+        months: Optional[List[int]] = None,
+        start: Optional[np.datetime64] = None,
+        end: Optional[np.datetime64] = None,
+        keywords: Optional[List[str]] = None,
+    ) -> np.ndarray:
+        """Boolean mask of the rows matching every given filter (end inclusive)"""
+        mask = np.ones(len(self), dtype=bool)
+        if txn_type == "DR":
+            mask &= self.is_debit
+        elif txn_type == "CR":
+            mask &= ~self.is_debit
+        if months:
+            month_of_year = self.dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+            mask &= np.isin(month_of_year, months)
+        if start is not None:
+            mask &= self.dates >= start
+        if end is not None:
+            mask &= self.dates <= end
+        if keywords:
+            mask &= self.keyword_mask(keywords)
+        return mask
+
+    def keyword_mask(self, keywords: List[str]) -> np.ndarray:
+        """Rows whose description contains any of the keywords as a word"""
+        lowered = np.array([f" {d.lower()} " for d in self.descriptions], dtype=str)
+        mask = np.zeros(len(self), dtype=bool)
+        for keyword in keywords:
+            mask |= np.char.find(lowered, f" {keyword}") >= 0
+        return mask
+
+    def total(self, mask: np.ndarray) -> float:
+        return float(self.amounts[mask].sum())
+
+    def largest(self, mask: np.ndarray, n: int = 1) -> np.ndarray:
+        """Row indices of the n largest amounts in the mask, largest first"""
+        rows = np.flatnonzero(mask)
+        return rows[np.argsort(self.amounts[rows], kind="stable")[::-1][:n]]
+
+    def smallest(self, mask: np.ndarray, n: int = 1) -> np.ndarray:
+        rows = np.flatnonzero(mask)
+        return rows[np.argsort(self.amounts[rows], kind="stable")[:n]]
+
+    def top_merchants(self, mask: np.ndarray, n: int = TOP_MERCHANTS_DEFAULT):
+        """(merchant, total, count) for the n merchants with the largest totals"""
+        codes = self.merchant_codes[mask]
+        totals = np.bincount(codes, weights=self.amounts[mask], minlength=len(self.merchants))
+        counts = np.bincount(codes, minlength=len(self.merchants))
+        order = np.argsort(totals, kind="stable")[::-1][:n]
+        return [
+            (self.merchants[code], float(totals[code]), int(counts[code]))
+            for code in order
+            if counts[code]
+        ]
+
+    def describe_row(self, row: int) -> str:
+        kind = "debit" if self.is_debit[row] else "credit"
+        date = self.dates[row].astype(datetime).strftime("%d %b %Y")
+        return (
+            f"{_format_amount(self.amounts[row])} {kind} on {date} "
+            f"at {self.merchants[self.merchant_codes[row]]}"
+        )
+
+
+class AggregateQuery(NamedTuple):
+    aggregates: Tuple[str, ...]
+    txn_type: Optional[str]
+    months: List[int]
+    start: Optional[np.datetime64]
+    end: Optional[np.datetime64]
+    keywords: List[str]
+    top_n: int
+
+
+def parse_aggregate_query(question: str, table: TransactionTable) -> Optional[AggregateQuery]:
+    """
+    Detect the numeric part of a question
+
+    Returns None when the question asks for no aggregate over transactions,
+    or names something no transaction description contains, so it is
+    answered from retrieved context as before.
+    """
+    text = question.lower()
+    if _DUE_RE.search(text) or not _TRANSACTION_CUE_RE.search(text):
+        return None
+    aggregates = tuple(
+        name
+        for name, pattern in (
+            ("sum", _SUM_RE),
+            ("count", _COUNT_RE),
+            ("max", _MAX_RE),
+            ("min", _MIN_RE),
+            ("avg", _AVG_RE),
+            ("top", _TOP_RE),
+        )
+        if pattern.search(text)
+    )
+    if not aggregates:
+        return None
+
+    txn_type = None
+    if _CREDIT_RE.search(text):
+        txn_type = "CR"
+    elif _DEBIT_RE.search(text) or "top" in aggregates:
+        # Merchant rankings are about spending unless credits are asked for
+        txn_type = "DR"
+
+    question_dates = [_parse_date(match) for match in _QUESTION_DATE_RE.findall(text)]
+    question_dates = sorted(date for date in question_dates if date is not None)
+    start = question_dates[0] if question_dates else None
+    end = question_dates[-1] if question_dates else None
+
+    words = _WORD_RE.findall(_QUESTION_DATE_RE.sub(" ", text))
+    dated_months = {
+        word for match in _MONTH_CONTEXT_RE.finditer(text) for word in match.groups() if word
+    }
+    months = sorted(
+        {
+            _MONTH_NAMES[word]
+            for word in words
+            if word in _MONTH_NAMES
+            and (word not in _AMBIGUOUS_MONTHS or word in dated_months)
+        }
+    )
+
+    # Remaining words filter descriptions, e.g. "emi", "swiggy"; a word no
+    # description contains cannot be answered exactly, and dropping it would
+    # widen the filter to every row
+    keywords = []
+    for word in dict.fromkeys(words):
+        if len(word) < 3 or word in _NON_KEYWORDS or word.isdigit():
+            continue
+        forms = (word, word[:-1]) if word.endswith("s") else (word,)
+        keyword = next((form for form in forms if table.keyword_mask([form]).any()), None)
+        if keyword is None:
+            return None
+        keywords.append(keyword)
+
+    top_n_match = _TOP_N_RE.search(text)
+    top_n = int(top_n_match.group(1)) if top_n_match else TOP_MERCHANTS_DEFAULT
+
+    return AggregateQuery(aggregates, txn_type, months, start, end, keywords, top_n)
+
+
+def compute_facts(table: TransactionTable, query: AggregateQuery) -> str:
+    """Exact figures for an aggregate query, as plain lines for the prompt"""
+    mask = table.select(
+        txn_type=query.txn_type,
+        months=query.months,
+        start=query.start,
+        end=query.end,
+        keywords=query.keywords,
+    )
+    matched = int(mask.sum())
+
+    filters = []
+    if query.txn_type:
+        filters.append("debits only" if query.txn_type == "DR" else "credits only")
+    if query.months:
+        filters.append(
+            "months: " + ", ".join(datetime(2000, m, 1).strftime("%B") for m in query.months)
+        )
+    if query.start is not None:
+        filters.append(
+            f"dates: {query.start.astype(datetime):%d %b %Y} to {query.end.astype(datetime):%d %b %Y}"
+        )
+    if query.keywords:
+        filters.append("description contains: " + ", ".join(query.keywords))
+
+    lines = [
+        f"Exact figures computed from all {len(table)} parsed transactions"
+        + (f" ({'; '.join(filters)})" if filters else ""),
+        f"- Matching transactions: {matched}",
+    ]
+    if not matched:
+        return "\n".join(lines)
+
+    debit_total = table.total(mask & table.is_debit)
+    credit_total = table.total(mask & ~table.is_debit)
+    if "sum" in query.aggregates or "avg" in query.aggregates:
+        if query.txn_type != "CR":
+            lines.append(f"- Total debits: {_format_amount(debit_total)}")
+        if query.txn_type != "DR":
+            lines.append(f"- Total credits: {_format_amount(credit_total)}")
+    if "avg" in query.aggregates:
+        lines.append(f"- Average amount: {_format_amount(table.total(mask) / matched)}")
+    if "max" in query.aggregates:
+        lines.extend(f"- Largest: {table.describe_row(row)}" for row in table.largest(mask))
+    if "min" in query.aggregates:
+        lines.extend(f"- Smallest: {table.describe_row(row)}" for row in table.smallest(mask))
+    if "top" in query.aggregates:
+        lines.append(f"- Top {query.top_n} merchants by amount:")
+        lines.extend(
+            f"  {rank}. {merchant}: {_format_amount(total)} across {count} transactions"
+            for rank, (merchant, total, count) in enumerate(
+                table.top_merchants(mask, query.top_n), start=1
+            )
+        )
+    return "\n".join(lines)
+
+
+@singleton
+class TransactionStore:
+    """
+    Per-session columnar transaction tables kept in Redis
+
+    Each session's table is a single hash of raw numpy column buffers under
+    the session prefix, so it expires and is dropped with the session.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL, ttl_seconds: int = SESSION_TTL_SECONDS):
+        # Binary client: columns are stored as raw numpy buffers
+        self.client = get_redis_client(redis_url)
+        self.ttl_seconds = ttl_seconds
+
+    def put(self, session_id: str, table: TransactionTable):
+        key = session_transactions_key(session_id)
+        pipe = self.client.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping=table.to_mapping())
+        pipe.expire(key, self.ttl_seconds)
+        pipe.execute()
+
+    def get(self, session_id: str) -> Optional[TransactionTable]:
+        key = session_transactions_key(session_id)
+        pipe = self.client.pipeline()
+        pipe.hgetall(key)
+        pipe.expire(key, self.ttl_seconds)
+        mapping, _ = pipe.execute()
+        return TransactionTable.from_mapping(mapping) if mapping else None
+
+    def answer(self, session_id: str, question: str) -> Optional[str]:
+        """
+        Compute the numeric part of a question exactly
+
+        Returns:
+            Plain-text facts to put in the prompt, or None when the question
+            has no aggregate intent or the session has no parsed transactions
+        """
+        table = self.get(session_id)
+        if table is None or not len(table):
+            return None
+        query = parse_aggregate_query(question, table)
+        if query is None:
+            return None
+        return compute_facts(table, query)
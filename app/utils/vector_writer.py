@@ -0,0 +1,107 @@
+import logging
+import os
+import time
+import uuid
+from array import array
+from typing import NamedTuple
+
+from dotenv import load_dotenv
+from langchain_community.vectorstores.redis import Redis
+
+from app.utils.decorators.singleton import singleton
+from app.utils.redis_pool import get_redis_client
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+# Documents sent per pipeline round trip
+VECTOR_WRITE_BATCH_SIZE = int(os.getenv("VECTOR_WRITE_BATCH_SIZE", "256"))
+
+logger = logging.getLogger(__name__)
+
+
+class WriteStats(NamedTuple):
+    chunks: int
+    bytes: int
+    seconds: float
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def combined(self, other: "WriteStats") -> "WriteStats":
+        return WriteStats(
+            self.chunks + other.chunks,
+            self.bytes + other.bytes,
+            self.seconds + other.seconds,
+        )
+
+    def describe(self) -> str:
+        return (
+            f"{self.chunks} chunks ({self.bytes / 1024:.1f} KiB) in "
+            f"{self.seconds * 1000:.1f}ms: {self.chunks_per_second:.0f} chunks/s, "
+            f"{self.bytes_per_second / (1024 * 1024):.2f} MiB/s"
+        )
+
+
+@singleton
+class VectorWriter:
+    """
+    Bulk writer for already encoded documents of a session index
+
+    Documents are written as hashes in the layout the langchain Redis
+    vectorstore reads (content, raw float32 vector, metadata fields), in
+    batches sent through one non-transactional pipeline each, over a
+    client shared by every upload of the process.
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL, batch_size: int = VECTOR_WRITE_BATCH_SIZE):
+        # Binary client: vectors are written as raw float32 bytes
+        self.client = get_redis_client(redis_url)
+        self.batch_size = batch_size
+
+    def write(self, rds: Redis, texts, metadatas, vectors) -> WriteStats:
+        """
+        Write documents to the index behind a vectorstore
+
+        Args:
+            rds: Vectorstore whose index already exists
+            texts: Chunk contents
+            metadatas: Metadata dict per chunk
+            vectors: Embedding per chunk
+
+        Returns:
+            WriteStats with the chunk count, payload bytes and elapsed time
+        """
+        schema = rds._schema
+        start = time.perf_counter()
+        written_bytes = 0
+
+        for batch_start in range(0, len(texts), self.batch_size):
+            batch_end = batch_start + self.batch_size
+            pipeline = self.client.pipeline(transaction=False)
+            for text, metadata, vector in zip(
+                texts[batch_start:batch_end],
+                metadatas[batch_start:batch_end],
+                vectors[batch_start:batch_end],
+            ):
+                vector_bytes = array("f", vector).tobytes()
+                mapping = {
+                    schema.content_key: text,
+                    schema.content_vector_key: vector_bytes,
+                }
+                mapping.update(
+                    {key: value for key, value in metadata.items() if value is not None}
+                )
+                pipeline.hset(f"{rds.key_prefix}:{uuid.uuid4().hex}", mapping=mapping)
+                written_bytes += len(vector_bytes) + len(text.encode())
+            pipeline.execute()
+
+        stats = WriteStats(len(texts), written_bytes, time.perf_counter() - start)
+        # Uploads write many small batches; callers log the per-upload totals
+        logger.debug(f"Wrote {stats.describe()} to {rds.index_name}")
+        return stats
@@ -0,0 +1,102 @@
+"""
+CPU throughput and parity of the embedding backends.
+
+Encodes statement-like sentences with each backend and reports batch
+throughput (sentences/sec) and single-query latency (ms/query). Vectors of
+every backend are compared with the torch backend by cosine similarity;
+the script exits non-zero if any backend falls below --min-cosine.
+
+Usage:
+    python -m benchmarks.bench_encoders --backends torch onnx onnx-int8 --threads 4
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from app.utils.embedding_registry import DEFAULT_EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE
+from app.utils.encoders import ENCODER_BACKENDS, create_encoder
+
+MERCHANTS = ["SWIGGY", "AMAZON PAY", "ZOMATO", "UBER", "IRCTC", "BIGBASKET", "NETFLIX"]
+CITIES = ["BANGALORE", "MUMBAI", "DELHI", "PUNE"]
+
+
+def synthetic_sentences(count, rng):
+    sentences = []
+    for _ in range(count):
+        merchant, city = rng.choice(MERCHANTS), rng.choice(CITIES)
+        amount = f"{rng.randint(50, 50000):,}.{rng.randint(0, 99):02d}"
+        if rng.random() < 0.5:
+            sentences.append(f"On {rng.randint(1, 28)} Aug 25, spent ₹{amount} at {merchant}")
+        else:
+            sentences.append(
+                f"{rng.randint(1, 28):02d} Aug 25 {merchant}, {city} {amount} DR "
+                f"Total amount due and minimum amount due for the statement period"
+            )
+    return sentences
+
+
+def cosine_rows(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", default=sorted(ENCODER_BACKENDS))
+    parser.add_argument("--sentences", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    sentences = synthetic_sentences(args.sentences, rng)
+    queries = [f"How much did I spend at {rng.choice(MERCHANTS)}?" for _ in range(args.queries)]
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    reference = None
+    failed = False
+
+    print(f"{args.sentences} sentences, {args.queries} queries, threads={args.threads or 'default'}")
+    for backend in backends:
+        encoder = create_encoder(
+            DEFAULT_EMBEDDING_MODEL, backend, EMBEDDING_BATCH_SIZE, args.threads
+        )
+        encoder.embed_documents(sentences[:EMBEDDING_BATCH_SIZE])  # warm-up
+
+        start = time.perf_counter()
+        vectors = np.asarray(encoder.embed_documents(sentences), dtype=np.float32)
+        throughput = len(sentences) / (time.perf_counter() - start)
+
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            encoder.embed_query(query)
+            timings.append(time.perf_counter() - start)
+
+        line = (
+            f"  {backend:10s}: {throughput:8.1f} sentences/s  "
+            f"{statistics.median(timings) * 1000:6.2f} ms/query"
+        )
+        if reference is None:
+            reference = vectors
+        else:
+            cosines = cosine_rows(vectors, reference)
+            ok = cosines.min() >= args.min_cosine
+            failed |= not ok
+            line += (
+                f"  cosine vs torch mean {cosines.mean():.4f} min {cosines.min():.4f}"
+                f" {'ok' if ok else 'BELOW THRESHOLD'}"
+            )
+        print(line)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
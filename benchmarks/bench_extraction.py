@@ -0,0 +1,97 @@
+"""
+Compare the single-pass extractor with the previous triple-parse path, and
+with page ranges streamed by parser processes as uploads are.
+
+Usage:
+    python -m benchmarks.bench_extraction statement.pdf [more.pdf ...] --repeat 5
+"""
+import argparse
+import statistics
+import time
+
+from langchain_community.document_loaders import PyPDFLoader
+
+from app.utils.document_extractor import DocumentExtractor, stream_statement_in_process
+from app.utils.extraction_executor import ExtractionExecutor
+from app.utils.tools.table_extractor import TableExtractionTool, page_shards
+
+PUT_TIMEOUT_SECONDS = 60
+
+
+def triple_parse(pdf_path, table_tool):
+    """The previous extraction path: PyPDFLoader, pdfplumber and a raw read"""
+    docs = PyPDFLoader(pdf_path).load()
+    full_text = "\n".join(page.page_content for page in docs)
+    tables = table_tool.run(pdf_path)
+    with open(pdf_path, "rb") as f:
+        pages = f.read().count(b"/Type/Page")
+    return {"full_text": full_text, "tables_data": tables, "total_pages": pages}
+
+
+def sharded_parse(pdf_bytes, total_pages, executor):
+    """Parse page ranges in the extraction process pool, as run_extraction_job does"""
+    shards = []
+    for start, end in page_shards(total_pages):
+        page_queue = executor.create_page_queue(end - start + 1)
+        future = executor.submit_cpu(
+            stream_statement_in_process, pdf_bytes, page_queue, PUT_TIMEOUT_SECONDS, start, end
+        )
+        shards.append((page_queue, future))
+
+    pages = []
+    for page_queue, future in shards:
+        while (page := page_queue.get()) is not None:
+            pages.append(page)
+        future.result()
+    return pages
+
+
+def time_runs(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pdf_paths", nargs="+")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    extractor = DocumentExtractor()
+    table_tool = TableExtractionTool()
+    executor = ExtractionExecutor()
+
+    try:
+        for pdf_path in args.pdf_paths:
+            with open(pdf_path, "rb") as f:
+                pdf_bytes = f.read()
+            result = extractor.extract_statement(pdf_path)
+            pages = result["metadata"]["total_pages"]
+            # Warm the process pool so worker start-up is not timed
+            sharded_parse(pdf_bytes, pages, executor)
+
+            legacy = time_runs(lambda: triple_parse(pdf_path, table_tool), args.repeat)
+            single = time_runs(lambda: extractor.extract_statement(pdf_path), args.repeat)
+            sharded = time_runs(
+                lambda: sharded_parse(pdf_bytes, pages, executor), args.repeat
+            )
+
+            legacy_median = statistics.median(legacy)
+            single_median = statistics.median(single)
+            sharded_median = statistics.median(sharded)
+            print(f"{pdf_path} ({pages} pages, {len(page_shards(pages))} ranges, {args.repeat} runs)")
+            print(f"  triple-parse : {legacy_median * 1000:8.1f} ms median")
+            print(f"  single-pass  : {single_median * 1000:8.1f} ms median")
+            print(f"  sharded      : {sharded_median * 1000:8.1f} ms median")
+            print(f"  speedup      : {legacy_median / single_median:8.2f}x single-pass, "
+                  f"{legacy_median / sharded_median:.2f}x sharded")
+    finally:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Recall@k and latency of hybrid (BM25 + vector, RRF) versus pure vector search.
+
+A synthetic statement with unique merchant names and reference codes is
+chunked and indexed like an uploaded statement. Each query asks for one
+exact token; a query is recalled when a chunk containing that token is in
+the top k. Needs a Redis Stack server at REDIS_URL and the embedding model.
+
+Usage:
+    python -m benchmarks.bench_hybrid_retrieval --transactions 400 --queries 100 --k 4
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from app.models.request import RetrievalMode
+from app.utils.create_embeddings import CreateEmbeddings
+from app.utils.dependencies import REDIS_URL
+from app.utils.redisdb import FULL_TEXT_INDEX, RedisDB
+from app.utils.retreiver import Retreiver
+
+MONTHS = ["Aug", "Sep", "Oct"]
+CITIES = ["BANGALORE", "MUMBAI", "DELHI", "PUNE", "CHENNAI"]
+SYLLABLES = ["ka", "lo", "mi", "ra", "zu", "ven", "tor", "qi", "bex", "dal"]
+
+
+def synthetic_statement(transactions, rng):
+    lines, targets = ["Card Number: XXXX XXXX XXXX 4821", "YOUR TRANSACTIONS"], []
+    for _ in range(transactions):
+        merchant = "".join(rng.choice(SYLLABLES) for _ in range(3)).upper()
+        reference = f"REF{rng.randrange(10**7, 10**8)}"
+        date = f"{rng.randint(1, 28):02d} {rng.choice(MONTHS)} 25"
+        amount = f"{rng.randint(50, 50000):,}.{rng.randint(0, 99):02d}"
+        lines.append(
+            f"{date} {merchant}, {rng.choice(CITIES)} {reference} {amount} {rng.choice(['DR', 'CR'])}"
+        )
+        targets.append((merchant, reference))
+    return "\n".join(lines), targets
+
+
+def run_queries(search, queries, k):
+    hits, timings = 0, []
+    for query, token in queries:
+        start = time.perf_counter()
+        results = search(query)
+        timings.append(time.perf_counter() - start)
+        hits += any(token in doc.page_content for doc, _ in results[:k])
+    return hits / len(queries), timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    text, targets = synthetic_statement(args.transactions, rng)
+
+    embedding = CreateEmbeddings()
+    embeddings = embedding.embedding_registry.get_embeddings()
+    session_id = f"bench-{uuid.uuid4()}"
+    redis_db = RedisDB(redis_url=REDIS_URL)
+
+    try:
+        documents = embedding.embed_text_data(text)
+        retreiver = Retreiver(
+            rds=embedding.store_documents(documents, FULL_TEXT_INDEX, session_id),
+            k=args.k,
+        )
+
+        queries = []
+        for merchant, reference in rng.sample(targets, min(args.queries, len(targets))):
+            if rng.random() < 0.5:
+                queries.append((f"How much did I pay at {merchant}?", merchant))
+            else:
+                queries.append((f"Show the transaction with reference {reference}", reference))
+        vectors = {query: embeddings.embed_query(query) for query, _ in queries}
+
+        modes = {
+            RetrievalMode.VECTOR: lambda q: retreiver.search_by_vector(vectors[q]),
+            RetrievalMode.HYBRID: lambda q: retreiver.hybrid_search(q, vectors[q]),
+        }
+
+        print(
+            f"{len(documents)} chunks from {args.transactions} transactions, "
+            f"{len(queries)} exact-token queries, k={args.k}"
+        )
+        for mode, search in modes.items():
+            recall, timings = run_queries(search, queries, args.k)
+            print(
+                f"  {mode.value:7s}: recall@{args.k} {recall:6.1%}  "
+                f"{statistics.median(timings) * 1000:6.2f} ms median search"
+            )
+    finally:
+        redis_db.drop_session(session_id)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Per-line cost of the compiled transaction line parser on a synthetic statement.
+
+The previous implementation (pattern strings rebuilt and re-scanned for every
+line) is reproduced here for comparison.
+
+Usage:
+    python -m benchmarks.bench_line_parser --lines 200000
+"""
+import argparse
+import random
+import re
+import time
+
+from app.utils.tools.transaction_line_parser import (
+    TRANSACTION_HEADERS,
+    TransactionLineParser,
+)
+
+MONTHS = ["Aug", "Sep", "Oct", "Nov", "Dec", "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul"]
+MERCHANTS = ["AMAZON PAY", "SWIGGY", "ZOMATO", "UBER INDIA", "IRCTC", "NETFLIX.COM", "BIGBASKET"]
+CITIES = ["BANGALORE", "MUMBAI", "DELHI", "PUNE", "CHENNAI"]
+
+
+def synthetic_statement(n_lines, seed=7):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n_lines):
+        if i % 40 == 0:
+            lines.append(rng.choice(TRANSACTION_HEADERS))
+        elif i % 40 == 39:
+            lines.append("")
+        elif i % 13 == 0:
+            lines.append("Reward points earned on this statement 1,240")
+        else:
+            lines.append(
+                f"{rng.randint(1, 28)} {rng.choice(MONTHS)} 25 "
+                f"{rng.choice(MERCHANTS)}, {rng.choice(CITIES)} "
+                f"{rng.randint(10, 99999):,}.{rng.randint(0, 99):02d} {rng.choice(['DR', 'CR'])}"
+            )
+    return [line.strip() for line in lines]
+
+
+def legacy_classify(line):
+    """Previous per-line logic: header scan, row check and parse as separate passes"""
+    if any(header in line for header in TRANSACTION_HEADERS):
+        return "header", None
+    if (
+        line.startswith("Card Number:")
+        or line.startswith("ACTIVE EMI")
+        or line.startswith("SPECIAL BENEFITS")
+        or len(line) == 0
+    ):
+        return "terminator", None
+    if not line or len(line.strip()) < 10:
+        return "other", None
+    patterns = [
+        r"^\d{1,2}\s+(Aug|Sep|Oct|Nov|Dec|Jan|Feb|Mar|Apr|May|Jun|Jul)\s+\d{2}",
+        r"(DR|CR)\s*$",
+    ]
+    if not any(re.search(pattern, line) for pattern in patterns):
+        return "other", None
+    date_match = re.match(
+        r"^(\d{1,2}\s+(Aug|Sep|Oct|Nov|Dec|Jan|Feb|Mar|Apr|May|Jun|Jul)\s+\d{2,4})",
+        line,
+    )
+    if not date_match:
+        return "row", None
+    date = date_match.group(1)
+    remaining = line[len(date):].strip()
+    amount_match = re.search(r"([\d,]+\.?\d*)\s+(DR|CR)\s*$", remaining)
+    if amount_match:
+        description = remaining[:amount_match.start()].strip()
+        return "row", (date, description, amount_match.group(1), amount_match.group(2))
+    return "row", None
+
+
+def time_per_line(fn, lines):
+    start = time.perf_counter()
+    results = [fn(line) for line in lines]
+    return (time.perf_counter() - start) / len(lines), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200_000)
+    args = parser.parse_args()
+
+    lines = synthetic_statement(args.lines)
+    line_parser = TransactionLineParser()
+
+    legacy_cost, legacy_results = time_per_line(legacy_classify, lines)
+    compiled_cost, compiled_results = time_per_line(line_parser.classify, lines)
+
+    mismatches = sum(
+        1
+        for (_, old), (_, new) in zip(legacy_results, compiled_results)
+        if old != (tuple(new) if new else None)
+    )
+
+    print(f"{args.lines} synthetic lines")
+    print(f"  legacy   : {legacy_cost * 1e6:6.2f} us/line")
+    print(f"  compiled : {compiled_cost * 1e6:6.2f} us/line")
+    print(f"  speedup  : {legacy_cost / compiled_cost:6.2f}x")
+    print(f"  parse mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Vector search latency of a session index in Redis versus in process memory.
+
+A synthetic statement is chunked and indexed like an uploaded statement,
+then the same precomputed query vectors are searched through RediSearch
+KNN and through the in-memory NumPy index. Reports median and p95 latency
+per backend and how often both return the same top k. Needs a Redis Stack
+server at REDIS_URL and the embedding model.
+
+Usage:
+    python -m benchmarks.bench_memory_index --transactions 400 --queries 200 --k 4
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from app.utils.create_embeddings import CreateEmbeddings
+from app.utils.dependencies import REDIS_URL
+from app.utils.redisdb import FULL_TEXT_INDEX, RedisDB
+from app.utils.retreiver import Retreiver
+
+MERCHANTS = ["SWIGGY", "AMAZON PAY", "ZOMATO", "UBER", "IRCTC", "BIGBASKET", "NETFLIX"]
+CITIES = ["BANGALORE", "MUMBAI", "DELHI", "PUNE", "CHENNAI"]
+
+
+def synthetic_statement(transactions, rng):
+    lines = ["Card Number: XXXX XXXX XXXX 4821", "YOUR TRANSACTIONS"]
+    for _ in range(transactions):
+        date = f"{rng.randint(1, 28):02d} Aug 25"
+        amount = f"{rng.randint(50, 50000):,}.{rng.randint(0, 99):02d}"
+        lines.append(
+            f"{date} {rng.choice(MERCHANTS)}, {rng.choice(CITIES)} {amount} "
+            f"{rng.choice(['DR', 'CR'])}"
+        )
+    return "\n".join(lines)
+
+
+def run_searches(retreiver, vectors, k):
+    results, timings = [], []
+    for vector in vectors:
+        start = time.perf_counter()
+        results.append(retreiver.search_by_vector(vector, k))
+        timings.append(time.perf_counter() - start)
+    return results, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=400)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    text = synthetic_statement(args.transactions, rng)
+
+    embedding = CreateEmbeddings()
+    embeddings = embedding.embedding_registry.get_embeddings()
+    session_id = f"bench-{uuid.uuid4()}"
+    redis_db = RedisDB(redis_url=REDIS_URL)
+
+    try:
+        documents = embedding.embed_text_data(text)
+        rds = embedding.store_documents(documents, FULL_TEXT_INDEX, session_id)
+        redis_retreiver = Retreiver(rds=rds, k=args.k)
+        memory_retreiver = Retreiver(rds=rds, k=args.k)
+
+        start = time.perf_counter()
+        memory_retreiver.load_memory_index(backend="memory")
+        load_ms = (time.perf_counter() - start) * 1000
+
+        queries = [
+            f"How much did I spend at {rng.choice(MERCHANTS)} in {rng.choice(CITIES)}?"
+            for _ in range(args.queries)
+        ]
+        vectors = embeddings.embed_documents(queries)
+
+        print(
+            f"{len(documents)} chunks, {len(queries)} queries, k={args.k}, "
+            f"in-memory load {load_ms:.1f}ms "
+            f"({memory_retreiver.memory_index.__sizeof__() / 1024:.1f} KiB)"
+        )
+        backends = {
+            "redis": run_searches(redis_retreiver, vectors, args.k),
+            "memory": run_searches(memory_retreiver, vectors, args.k),
+        }
+        for name, (_, timings) in backends.items():
+            timings = sorted(timings)
+            print(
+                f"  {name:6s}: {statistics.median(timings) * 1000:6.3f} ms median  "
+                f"{timings[int(len(timings) * 0.95) - 1] * 1000:6.3f} ms p95"
+            )
+
+        same = sum(
+            [doc.page_content for doc, _ in redis_results]
+            == [doc.page_content for doc, _ in memory_results]
+            for redis_results, memory_results in zip(
+                backends["redis"][0], backends["memory"][0]
+            )
+        )
+        print(f"  identical top {args.k}: {same / len(queries):.1%}")
+    finally:
+        redis_db.drop_session(session_id)
+
+
+if __name__ == "__main__":
+    main()
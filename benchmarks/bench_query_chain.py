@@ -0,0 +1,100 @@
+"""
+Time-to-first-token of QueryChain with a per-query build versus a cached chain.
+
+A local stand-in chat model and in-memory vector stores replace Groq and
+Redis, so the numbers isolate per-query chain setup overhead. The per-query
+case still pays the setup the chain used to do on every query: a new
+ChatGroq with its own HTTP clients, a new PromptTemplate and new retriever
+wrappers. Only the stand-in model is used to answer.
+
+Usage:
+    python -m benchmarks.bench_query_chain --queries 50
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import PromptTemplate
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_groq import ChatGroq
+
+from app.utils.chains.query_chain import FINANCE_PROMPT, LLM_MODEL, QueryChain
+from app.utils.retreiver import Retreiver
+
+ANSWER = "### Summary\n\nYou spent the most on dining this month."
+
+
+def stand_in_llm():
+    return GenericFakeChatModel(messages=itertools.cycle([AIMessage(content=ANSWER)]))
+
+
+EMBEDDING = DeterministicFakeEmbedding(size=384)
+
+
+def build_retreivers():
+    embedding = EMBEDDING
+    transactions = InMemoryVectorStore.from_texts(
+        [f"On {d} Aug 25, spent ₹{d * 100} at MERCHANT {d}" for d in range(1, 29)],
+        embedding,
+    )
+    full_text = InMemoryVectorStore.from_texts(
+        [f"Statement chunk {i} with account summary text" for i in range(50)],
+        embedding,
+    )
+    return Retreiver(rds=transactions, k=12), Retreiver(rds=full_text)
+
+
+def legacy_setup(transactions, full_text):
+    """What building the chain used to cost on every query"""
+    # Never called; the key only satisfies the client's constructor
+    ChatGroq(model=LLM_MODEL, temperature=0.4, streaming=True, api_key="unused")
+    PromptTemplate(
+        input_variables=FINANCE_PROMPT.input_variables,
+        template=FINANCE_PROMPT.template,
+    )
+    transactions.retreive_using_similarity()
+    full_text.retreive_using_similarity()
+
+
+async def time_to_first_token(chain_factory, queries):
+    timings = []
+    for i in range(queries):
+        start = time.perf_counter()
+        query_chain = chain_factory()
+        async for _ in query_chain.generate_response(f"what did I spend on day {i}?"):
+            timings.append(time.perf_counter() - start)
+            break
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    transactions, full_text = build_retreivers()
+    llm = stand_in_llm()
+
+    def per_query():
+        legacy_setup(transactions, full_text)
+        return QueryChain(
+            transactions, full_text, llm=stand_in_llm(), embedding=EMBEDDING
+        )
+
+    cached_chain = QueryChain(transactions, full_text, llm=llm, embedding=EMBEDDING)
+
+    before = await time_to_first_token(per_query, args.queries)
+    after = await time_to_first_token(lambda: cached_chain, args.queries)
+
+    print(f"{args.queries} queries, stand-in LLM")
+    print(f"  rebuilt per query : {statistics.median(before) * 1000:7.2f} ms median TTFT")
+    print(f"  cached per session: {statistics.median(after) * 1000:7.2f} ms median TTFT")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
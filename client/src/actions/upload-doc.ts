@@ -1,5 +1,35 @@
 "use server";
 
+const STATUS_POLL_INTERVAL_MS = 1000;
+const STATUS_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+async function waitForExtraction(sessionId: string) {
+    const deadline = Date.now() + STATUS_POLL_TIMEOUT_MS;
+
+    while (Date.now() < deadline) {
+        const response = await fetch(`${process.env.API_URL}/api/extraction/${sessionId}`, {
+            cache: "no-store"
+        });
+
+        if (!response.ok) {
+            const error = await response.json();
+            return { ready: false, error: error.detail || "Extraction Failed" };
+        }
+
+        const job = await response.json();
+        if (job.stage === "ready") {
+            return { ready: true, description: job.description };
+        }
+        if (job.stage === "failed") {
+            return { ready: false, error: job.description || "Extraction Failed" };
+        }
+
+        await new Promise((resolve) => setTimeout(resolve, STATUS_POLL_INTERVAL_MS));
+    }
+
+    return { ready: false, error: "Extraction timed out" };
+}
+
 export async function uploadDocToAPI(file: File) {
 
     try {
@@ -48,11 +78,19 @@ export async function uploadDocToAPI(file: File) {
         }
 
         const result = await response.json();
+        const extraction = await waitForExtraction(result.session_id);
+
+        if (!extraction.ready) {
+            return {
+                success: false,
+                error: extraction.error
+            };
+        }
 
         return {
             success: true,
             status: result.status,
-            description: result.description,
+            description: extraction.description,
             sessionId: result.session_id
         };
 
@@ -0,0 +1,40 @@
+from langchain_core.documents import Document
+
+from app.utils.chains.context_assembler import (
+    EMPTY_SECTION_TEXT,
+    ContextAssembler,
+    estimate_tokens,
+    truncate_to_tokens,
+)
+
+
+def table_document(rows: int) -> Document:
+    lines = [f"{day:02d} Aug 25 SWIGGY, BANGALORE 450.00 DR" for day in range(1, rows + 1)]
+    return Document(page_content="\n".join(lines))
+
+
+def test_truncate_to_tokens_keeps_whole_tokens():
+    assert truncate_to_tokens("450.00 DR at SWIGGY", 3) == "450.00"
+    assert truncate_to_tokens("450.00 DR", 10) == "450.00 DR"
+    assert truncate_to_tokens("450.00 DR", 0) == ""
+
+
+def test_oversized_top_chunk_is_cut_to_the_budget():
+    assembler = ContextAssembler(token_budget=100)
+    context = assembler.assemble([(table_document(40), 0.1)], [])
+
+    assert context.transactions != EMPTY_SECTION_TEXT
+    assert context.transactions.startswith("- 01 Aug 25 SWIGGY")
+    assert context.context_tokens == 100
+    assert estimate_tokens(context.transactions) <= 100 + 1  # the "-" bullet
+    assert context.chunks_truncated == 1
+
+
+def test_small_remainder_is_not_filled_with_a_fragment():
+    assembler = ContextAssembler(token_budget=100)
+    short = Document(page_content=" ".join(["word"] * 90))
+    context = assembler.assemble([(table_document(40), 0.2)], [(short, 0.1)])
+
+    assert context.transactions == EMPTY_SECTION_TEXT
+    assert context.chunks_used == 1
+    assert context.chunks_dropped == 1
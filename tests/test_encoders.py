@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("sentence_transformers")
+
+from app.utils.embedding_registry import DEFAULT_EMBEDDING_MODEL
+from app.utils.encoders import create_encoder
+
+SENTENCES = [
+    "02 Aug 25 SWIGGY BANGALORE 450.00 DR",
+    "09 Aug 25 AMAZON PAY INDIA PRIVATE LIMITED 10,000.00 DR",
+    "20 Aug 25 PAYMENT RECEIVED - THANK YOU 5,000.00 CR",
+    "Total amount due 12,450.00 Minimum amount due 620.00",
+    "Interest is charged at 3.6% per month on the outstanding balance",
+]
+
+
+@pytest.fixture(scope="module")
+def torch_vectors():
+    encoder = create_encoder(DEFAULT_EMBEDDING_MODEL, backend="torch")
+    return np.array(encoder.embed_documents(SENTENCES))
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_onnx_backend_matches_torch(backend, torch_vectors):
+    encoder = create_encoder(DEFAULT_EMBEDDING_MODEL, backend=backend)
+    vectors = np.array(encoder.embed_documents(SENTENCES))
+
+    cosines = (vectors * torch_vectors).sum(axis=1) / (
+        np.linalg.norm(vectors, axis=1) * np.linalg.norm(torch_vectors, axis=1)
+    )
+    assert cosines.min() >= 0.98
+
+
+def test_onnx_query_matches_documents():
+    encoder = create_encoder(DEFAULT_EMBEDDING_MODEL, backend="onnx")
+
+    query = np.array(encoder.embed_query(SENTENCES[0]))
+    document = np.array(encoder.embed_documents(SENTENCES[:1])[0])
+    assert np.allclose(query, document, atol=1e-5)
@@ -0,0 +1,120 @@
+import pytest
+
+from app.models.response import ExtractionStage, Status
+from app.utils.job_manager import JobManager
+from app.utils.redisdb import (
+    TRANSACTIONS_INDEX,
+    RedisDB,
+    session_index_key_prefix,
+    session_index_name,
+    session_job_key,
+    session_meta_key,
+    session_transactions_key,
+)
+
+REDIS_URL = "redis://localhost:6379"
+
+
+class FakeRedis:
+    """The string-key and RediSearch commands JobManager and drop_session use"""
+
+    def __init__(self):
+        self.data = {}
+        # Index name -> key prefix of its documents
+        self.indexes = {}
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    unlink = delete
+
+    def execute_command(self, command, *args):
+        if command == "FT._LIST":
+            return list(self.indexes)
+        assert command == "FT.SEARCH"
+        index_name, _, _, _, offset, limit = args
+        keys = [key for key in self.data if key.startswith(self.indexes[index_name])]
+        return [len(keys)] + keys[offset:offset + limit]
+
+    def ft(self, index_name):
+        indexes = self.indexes
+
+        class Search:
+            def dropindex(self, delete_documents=False):
+                del indexes[index_name]
+
+        return Search()
+
+
+@pytest.fixture
+def redis_client():
+    return FakeRedis()
+
+
+@pytest.fixture
+def job_manager(redis_client):
+    job_manager = JobManager(redis_url=REDIS_URL)
+    job_manager.redis_db.client = redis_client
+    job_manager.jobs.clear()
+    return job_manager
+
+
+@pytest.fixture
+def redis_db(redis_client):
+    redis_db = RedisDB(redis_url=REDIS_URL)
+    redis_db.client = redis_client
+    return redis_db
+
+
+def test_failed_job_survives_session_drop(job_manager, redis_db, redis_client):
+    job_manager.create_job("s1")
+    redis_client.set(session_meta_key("s1"), "{}")
+
+    # What run_extraction_job does when extraction fails
+    job_manager.update_job(
+        "s1",
+        status=Status.FAILURE,
+        stage=ExtractionStage.FAILED,
+        description="Extraction failed: broken PDF",
+    )
+    assert redis_db.drop_session("s1")
+
+    job = job_manager.get_job("s1")
+    assert job.stage == ExtractionStage.FAILED
+    assert job.description == "Extraction failed: broken PDF"
+    assert redis_client.get(session_meta_key("s1")) is None
+
+
+def test_delete_job_removes_the_record(job_manager, redis_db):
+    job_manager.create_job("s2")
+    redis_db.drop_session("s2")
+    job_manager.delete_job("s2")
+
+    assert job_manager.get_job("s2") is None
+
+
+def test_drop_session_removes_only_that_sessions_keys(job_manager, redis_db, redis_client):
+    job_manager.create_job("s3")
+    for session_id in ("s3", "s4"):
+        redis_client.indexes[session_index_name(TRANSACTIONS_INDEX, session_id)] = (
+            session_index_key_prefix(TRANSACTIONS_INDEX, session_id)
+        )
+        redis_client.set(session_meta_key(session_id), "{}")
+        redis_client.set(session_transactions_key(session_id), b"")
+        for chunk in range(5):
+            prefix = session_index_key_prefix(TRANSACTIONS_INDEX, session_id)
+            redis_client.set(f"{prefix}:{chunk}", b"")
+
+    assert redis_db.drop_session("s3", batch_size=2)
+
+    assert sorted(redis_client.data) == sorted(
+        [session_job_key("s3"), session_meta_key("s4"), session_transactions_key("s4")]
+        + [f"{session_index_key_prefix(TRANSACTIONS_INDEX, 's4')}:{chunk}" for chunk in range(5)]
+    )
+    assert list(redis_client.indexes) == [session_index_name(TRANSACTIONS_INDEX, "s4")]
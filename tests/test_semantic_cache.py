@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.utils.semantic_cache import SemanticCache
+
+REDIS_URL = "redis://localhost:6379"
+
+
+class UnreachableRedis:
+    def hgetall(self, key):
+        raise ConnectionError("Connection refused")
+
+
+@pytest.fixture
+def semantic_cache():
+    semantic_cache = SemanticCache(redis_url=REDIS_URL)
+    semantic_cache.client = UnreachableRedis()
+    semantic_cache.hits = semantic_cache.misses = 0
+    return semantic_cache
+
+
+def test_lookup_failure_counts_as_a_miss(semantic_cache):
+    vector = np.ones(4, dtype=np.float32) / 2
+
+    assert semantic_cache.lookup("s1", vector) is None
+    assert semantic_cache.get_metrics()["misses"] == 1
+    assert semantic_cache.get_metrics()["hits"] == 0
@@ -0,0 +1,109 @@
+import pytest
+
+from app.utils.transaction_store import (
+    TransactionTable,
+    compute_facts,
+    parse_aggregate_query,
+)
+
+ROWS = [
+    ("28 May 25", "SWIGGY, BANGALORE", "300.00", "DR"),
+    ("02 Aug 25", "SWIGGY, BANGALORE", "450.00", "DR"),
+    ("05 Aug 25", "SWIGGY, BANGALORE", "1,200.00", "DR"),
+    ("09 Aug 25", "AMAZON PAY, MUMBAI", "10,000.00", "DR"),
+    ("12 Aug 25", "EMI CONVERSION, HDFC", "800.00", "DR"),
+    ("20 Aug 25", "PAYMENT RECEIVED, THANK YOU", "5,000.00", "CR"),
+]
+
+
+@pytest.fixture
+def table():
+    return TransactionTable.from_rows(ROWS)
+
+
+def test_spend_at_merchant_filters_by_description(table):
+    query = parse_aggregate_query("How much did I spend at Swiggy?", table)
+
+    assert query.aggregates == ("sum",)
+    assert query.txn_type == "DR"
+    assert query.keywords == ["swiggy"]
+    assert "- Total debits: ₹1,950.00" in compute_facts(table, query)
+
+
+def test_may_as_a_verb_is_not_a_month(table):
+    query = parse_aggregate_query("How much may I have spent at Swiggy?", table)
+
+    assert query.months == []
+    assert "- Matching transactions: 3" in compute_facts(table, query)
+
+
+@pytest.mark.parametrize(
+    "question",
+    ["How much did I spend at Swiggy in May?", "Total Swiggy spend for May 2025"],
+)
+def test_may_next_to_a_date_cue_is_a_month(table, question):
+    query = parse_aggregate_query(question, table)
+
+    assert query.months == [5]
+    assert "- Total debits: ₹300.00" in compute_facts(table, query)
+
+
+def test_plural_term_matches_singular_description(table):
+    query = parse_aggregate_query("How much did I pay in EMIs?", table)
+
+    assert query.keywords == ["emi"]
+    assert "- Total debits: ₹800.00" in compute_facts(table, query)
+
+
+def test_unmatched_term_falls_back_to_retrieval(table):
+    assert parse_aggregate_query("How much did I spend at Starbucks?", table) is None
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "What is my total amount due?",
+        "What is my minimum amount due?",
+        "What is the minimum due on this statement?",
+        "What is my total due?",
+        "How much is the total amount due for my transactions?",
+    ],
+)
+def test_statement_due_fields_are_not_aggregates(table, question):
+    assert parse_aggregate_query(question, table) is None
+
+
+@pytest.mark.parametrize(
+    "question",
+    ["What is the total?", "What is the maximum?", "What is my minimum?"],
+)
+def test_aggregate_words_need_a_transaction_cue(table, question):
+    assert parse_aggregate_query(question, table) is None
+
+
+def test_largest_transaction(table):
+    query = parse_aggregate_query("What was my largest transaction?", table)
+
+    assert query.aggregates == ("max",)
+    assert "- Largest: ₹10,000.00 debit on 09 Aug 2025 at AMAZON PAY" in compute_facts(
+        table, query
+    )
+
+
+def test_top_merchants_default_to_debits(table):
+    query = parse_aggregate_query("Top 2 merchants in August", table)
+
+    assert query.txn_type == "DR"
+    assert query.months == [8]
+    facts = compute_facts(table, query)
+    assert "1. AMAZON PAY: ₹10,000.00 across 1 transactions" in facts
+    assert "2. SWIGGY: ₹1,650.00 across 2 transactions" in facts
+
+
+def test_credits_total(table):
+    query = parse_aggregate_query("What is the total of my credits?", table)
+
+    assert query.txn_type == "CR"
+    facts = compute_facts(table, query)
+    assert "- Total credits: ₹5,000.00" in facts
+    assert "Total debits" not in facts